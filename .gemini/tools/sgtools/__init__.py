@@ -0,0 +1,9 @@
+"""SuperGemini 프레임워크 로컬 도구 모음.
+
+`.gemini/` 아래의 프롬프트 문서와 `/sg:*` 명령이 가정하는 동작을
+외부 의존성 없이(표준 라이브러리만 사용) 로컬에서 수행하는 도구들입니다.
+각 모듈은 `python -m sgtools.<module>` 형태로 실행할 수 있습니다.
+"""
+
+GEMINI_DIR_NAME = ".gemini"
+CACHE_DIR_NAME = ".cache"
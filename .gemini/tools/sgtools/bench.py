@@ -0,0 +1,325 @@
+"""`/sg:load`, `/sg:save` 지연 목표를 검사하는 오프라인 벤치마크.
+
+`commands/sg/load.toml`과 `save.toml`에 적힌 목표(프로젝트 초기화 <500ms,
+핵심 메모리 작업 <200ms, 체크포인트 생성 <1s)를 명령 파일에서 직접 읽어,
+로컬 MCP 메모리 서버(`sgtools.memory.server`)를 하위 프로세스로 띄우고
+표준 입출력 JSON-RPC로 세션 흐름을 재현합니다.
+
+합성 세션은 `MODE_Task_Management_ko.md`의 키 스키마(plan/phase/task/todo/
+decisions/blockers)를 따르며, 고정 시드로 생성되어 재현 가능합니다. 작업별
+p50/p95/p99를 보고하고 결과를 JSON 파일로 남기며, 목표를 넘으면 종료 코드 1로
+실패합니다.
+
+사용법::
+
+    python -m sgtools.bench [--sizes 10,1000,10000] [--checkpoints 1,10,100] [--output FILE]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .context import ContextError, find_root
+from .memory.recall import RecallIndex
+from .memory.store import MemoryStore
+from .project_index import ProjectIndex
+
+# 목표 문구 → 측정 범주
+TARGET_PATTERNS = (
+    ("project_init", re.compile(r"<\s*(\d+(?:\.\d+)?)\s*(ms|s)\s+initialization")),
+    ("memory_op", re.compile(r"<\s*(\d+(?:\.\d+)?)\s*(ms|s)\s+for\s+(?:core|memory)\s+operations")),
+    ("checkpoint", re.compile(r"<\s*(\d+(?:\.\d+)?)\s*(ms|s)\s+for\s+checkpoint\s+creation")),
+)
+
+# 작업 → 범주
+CATEGORIES = {
+    "project_init_cold": "project_init",
+    "project_init_warm": "project_init",
+    "write_memory": "memory_op",
+    "read_memory": "memory_op",
+    "list_memories": "memory_op",
+    "list_prefix": "memory_op",
+    "recall_memories": "memory_op",
+    "delete_glob": "memory_op",
+    "save_checkpoint": "checkpoint",
+    "load_checkpoint": "memory_op",
+}
+
+_WORDS = ("인증", "미들웨어", "구현", "완료", "대기 중", "테스트", "검증", "단계", "결정", "장애물",
+          "JWT", "token", "api", "config", "캐시", "배포", "리팩터링", "성능", "보안", "문서")
+
+
+def load_targets(commands_dir: str) -> Dict[str, float]:
+    """명령 파일의 프롬프트에서 범주별 목표(ms)를 읽습니다. 같은 범주는 가장 엄격한 값을 씁니다."""
+    targets: Dict[str, float] = {}
+    for name in ("load.toml", "save.toml"):
+        path = os.path.join(commands_dir, name)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                text = fh.read()
+        except OSError:
+            continue
+        for category, pattern in TARGET_PATTERNS:
+            for value, unit in pattern.findall(text):
+                ms = float(value) * (1000.0 if unit == "s" else 1.0)
+                targets[category] = min(ms, targets.get(category, ms))
+    return targets
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """최근접 순위 백분위수."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(p / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _text(rnd: random.Random, lo: int, hi: int) -> str:
+    return " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(lo, hi)))
+
+
+def populate(store: MemoryStore, count: int, seed: int) -> None:
+    """`count`개 메모리로 합성 세션을 만듭니다."""
+    rnd = random.Random(seed)
+    with store.batch():
+        store.put("plan_bench", _text(rnd, 10, 30))
+        store.put("current_plan", "plan_bench")
+        store.put("decisions", _text(rnd, 20, 60))
+        store.put("blockers", _text(rnd, 5, 20))
+        n = 4
+        phase = task = 0
+        while n < count:
+            phase = phase % 5 + 1
+            task += 1
+            store.put(f"phase_{phase}", _text(rnd, 5, 15))
+            store.put(f"task_{phase}.{task}", _text(rnd, 5, 25))
+            n += 2
+            for todo in range(min(8, count - n)):
+                store.put(f"todo_{phase}.{task}.{todo}", _text(rnd, 3, 12))
+                n += 1
+
+
+class McpClient:
+    """로컬 MCP 서버와 표준 입출력으로 통신하는 최소 클라이언트."""
+
+    def __init__(self, store_path: str):
+        env = dict(os.environ)
+        tools_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env["PYTHONPATH"] = tools_dir + os.pathsep + env.get("PYTHONPATH", "")
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "sgtools.memory.server", "--store", store_path],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, text=True, encoding="utf-8",
+        )
+        self._id = 0
+
+    def request(self, method: str, params: Optional[dict] = None) -> dict:
+        self._id += 1
+        message = {"jsonrpc": "2.0", "id": self._id, "method": method, "params": params or {}}
+        self.proc.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+        self.proc.stdin.flush()
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError("MCP 서버가 종료되었습니다")
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(response["error"]["message"])
+        return response["result"]
+
+    def call(self, tool: str, **arguments) -> str:
+        result = self.request("tools/call", {"name": tool, "arguments": arguments})
+        text = result["content"][0]["text"]
+        if result.get("isError"):
+            raise RuntimeError(f"{tool}: {text}")
+        return text
+
+    def initialize(self) -> None:
+        self.request("initialize", {"protocolVersion": "2024-11-05"})
+        self.proc.stdin.write(json.dumps({"jsonrpc": "2.0", "method": "notifications/initialized"}) + "\n")
+
+    def close(self) -> None:
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=30)
+
+
+@dataclass
+class Samples:
+    operation: str
+    size: int
+    values: List[float] = field(default_factory=list)
+
+    def timed(self, func, *args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.values.append((time.perf_counter() - started) * 1000.0)
+        return result
+
+    def summary(self) -> dict:
+        return {
+            "operation": self.operation,
+            "category": CATEGORIES[self.operation],
+            "memories": self.size,
+            "samples": len(self.values),
+            "p50_ms": round(percentile(self.values, 50), 3),
+            "p95_ms": round(percentile(self.values, 95), 3),
+            "p99_ms": round(percentile(self.values, 99), 3),
+            "max_ms": round(max(self.values), 3) if self.values else 0.0,
+        }
+
+
+def load_flow(store_path: str, project_root: str, index_path: str) -> None:
+    """`/sg:load`: 초기화 → 프로젝트 구조 분석 → 메모리 로드 → 활성화.
+
+    프로젝트 인덱스는 `index_path`(임시 디렉토리)에 두어 사용자의 캐시를 건드리지 않습니다.
+    """
+    client = McpClient(store_path)
+    try:
+        client.initialize()
+        with ProjectIndex(project_root, index_path) as index:
+            index.refresh()
+        names = json.loads(client.call("list_memories"))
+        if "current_plan" in names:
+            plan = client.call("read_memory", memory_file_name="current_plan")
+            if plan in names:
+                client.call("read_memory", memory_file_name=plan)
+    finally:
+        client.close()
+
+
+def bench_size(size: int, checkpoints: int, iterations: int, project_root: str, seed: int) -> List[Samples]:
+    workdir = tempfile.mkdtemp(prefix="sgbench-")
+    store_path = os.path.join(workdir, "memory")
+    try:
+        with MemoryStore(store_path) as store:
+            populate(store, size, seed)
+            recall = RecallIndex(store)
+            recall.rebuild()
+            recall.save()
+        rnd = random.Random(seed + size)
+
+        # 콜드: 인덱스 없이 전체 빌드, 웜: 기존 인덱스를 갱신만 합니다.
+        index_path = os.path.join(workdir, "project-index.sqlite")
+        cold = Samples("project_init_cold", size)
+        warm = Samples("project_init_warm", size)
+        for _ in range(max(3, iterations // 10)):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(index_path + suffix):
+                    os.remove(index_path + suffix)
+            cold.timed(load_flow, store_path, project_root, index_path)
+            warm.timed(load_flow, store_path, project_root, index_path)
+
+        client = McpClient(store_path)
+        try:
+            client.initialize()
+            names = json.loads(client.call("list_memories"))
+            ops = {name: Samples(name, size) for name in
+                   ("write_memory", "read_memory", "list_memories", "list_prefix", "recall_memories",
+                    "delete_glob")}
+            for i in range(iterations):
+                ops["write_memory"].timed(client.call, "write_memory",
+                                          memory_name=f"todo_bench.{i:05d}", content=_text(rnd, 3, 12))
+                ops["read_memory"].timed(client.call, "read_memory", memory_file_name=rnd.choice(names))
+                ops["list_memories"].timed(client.call, "list_memories")
+                ops["list_prefix"].timed(client.call, "list_memories", pattern=f"task_{rnd.randint(1, 5)}.*")
+                ops["recall_memories"].timed(client.call, "recall_memories",
+                                             query=_text(rnd, 2, 4), token_budget=500)
+            for i in range(iterations):
+                ops["delete_glob"].timed(client.call, "delete_memory", memory_file_name=f"todo_bench.{i:05d}*")
+
+            save = Samples("save_checkpoint", size)
+            load = Samples("load_checkpoint", size)
+            for i in range(checkpoints):
+                for _ in range(5):
+                    client.call("write_memory", memory_name=rnd.choice(names), content=_text(rnd, 3, 12))
+                save.timed(client.call, "save_checkpoint", checkpoint_id=f"bench_{i:04d}")
+            for _ in range(min(checkpoints, iterations)):
+                load.timed(client.call, "load_checkpoint",
+                           checkpoint_id=f"bench_{rnd.randrange(checkpoints):04d}")
+        finally:
+            client.close()
+        return [cold, warm, *ops.values(), save, load]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def evaluate(results: List[dict], targets: Dict[str, float], metric: str) -> List[str]:
+    failures = []
+    for row in results:
+        target = targets.get(row["category"])
+        if target is not None and row[metric] > target:
+            failures.append(f"{row['operation']} @ {row['memories']} memories: "
+                            f"{metric} {row[metric]:.1f}ms > {target:g}ms")
+    return failures
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="sgtools.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=_int_list, default=[10, 1000, 10000], help="메모리 개수 목록")
+    parser.add_argument("--checkpoints", type=_int_list, default=[1, 10, 100],
+                        help="크기별 체크포인트 개수 목록 (--sizes와 같은 길이이거나 하나)")
+    parser.add_argument("--iterations", type=int, default=50, help="메모리 작업별 반복 횟수")
+    parser.add_argument("--metric", choices=("p50_ms", "p95_ms", "p99_ms"), default="p95_ms",
+                        help="목표와 비교할 지표")
+    parser.add_argument("--project", help="초기화 흐름에서 인덱싱할 프로젝트 (기본값: 이 저장소)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", "-o", help="JSON 결과 파일")
+    args = parser.parse_args(argv)
+
+    try:
+        gemini_dir = os.path.dirname(find_root())
+    except ContextError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    targets = load_targets(os.path.join(gemini_dir, "commands", "sg"))
+    project_root = os.path.abspath(args.project or os.path.dirname(gemini_dir))
+    checkpoints = args.checkpoints * len(args.sizes) if len(args.checkpoints) == 1 else args.checkpoints
+    if len(checkpoints) != len(args.sizes):
+        parser.error("--checkpoints는 값 하나이거나 --sizes와 같은 길이여야 합니다")
+
+    results: List[dict] = []
+    for size, count in zip(args.sizes, checkpoints):
+        for samples in bench_size(size, count, args.iterations, project_root, args.seed):
+            results.append(samples.summary())
+
+    failures = evaluate(results, targets, args.metric)
+    header = f"{'operation':<18} {'memories':>8} {'n':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'target':>8}"
+    print(header)
+    for row in results:
+        target = targets.get(row["category"])
+        print(f"{row['operation']:<18} {row['memories']:>8} {row['samples']:>4} {row['p50_ms']:>9.2f} "
+              f"{row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {target if target is not None else '-':>8}")
+    for message in failures:
+        print(f"FAIL: {message}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({
+                "targets_ms": targets,
+                "metric": args.metric,
+                "seed": args.seed,
+                "python": sys.version.split()[0],
+                "results": results,
+                "failures": failures,
+                "passed": not failures,
+            }, fh, ensure_ascii=False, indent=2)
+            fh.write("\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""`--uc` 기호/약어 압축을 위한 스트리밍 변환기.
+
+`MODE_Token_Efficiency_ko.md`의 기호 시스템(→ ⇒ ∴ ∵ ✅ ❌ ⚠️ …)과 약어
+시스템(`cfg`, `impl`, `perf`, `deps`, `val`, `sec` …)을 도구 출력, 로그, 파일
+발췌에 실제로 적용합니다. 입력을 청크 단위로 처리하며, 보류 버퍼는 패턴 최대
+길이만큼만 유지하므로 메모리 사용량이 입력 크기와 무관합니다.
+
+입력은 도착하는 대로 읽고(`read1`), 줄바꿈까지 확정된 출력은 바로 내보내므로
+`make test | python -m sgtools.compress`처럼 느린 파이프에서도 줄 단위로
+지연 없이 흐릅니다. 잘못된 UTF-8 바이트는 `--errors` 정책(기본값
+`surrogateescape`는 원래 바이트를 그대로 보존, `replace`는 U+FFFD로 대체)에
+따라 입력과 출력 양쪽에서 같은 방식으로 처리됩니다.
+
+변환은 가역적입니다. 원문에 이미 있는 기호나 약어 앞에는 이스케이프 문자
+`␛`를 붙이고(원문의 `␛`는 `␛␛`), `--expand`는 이를 되돌려 원문을 그대로
+복원합니다. `--stats`는 스트림별 실제 토큰 감소율을 표준 오류로 보고합니다.
+
+사용법::
+
+    make test 2>&1 | python -m sgtools.compress --stats
+    python -m sgtools.compress build.log --check-roundtrip
+    python -m sgtools.compress --expand < build.log.uc
+"""
+
+import argparse
+import codecs
+import json
+import re
+import sys
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .tokens import get_tokenizer
+
+ESCAPE = "\u241b"  # ␛
+ERROR_POLICIES = ("surrogateescape", "replace")
+
+# 약어 시스템: 소문자/첫 글자 대문자/전체 대문자 형태를 각각 대응시킵니다.
+ABBREVIATIONS: Tuple[Tuple[str, str], ...] = (
+    ("configuration", "cfg"),
+    ("implementation", "impl"),
+    ("architecture", "arch"),
+    ("performance", "perf"),
+    ("operations", "ops"),
+    ("environment", "env"),
+    ("requirements", "req"),
+    ("dependencies", "deps"),
+    ("validation", "val"),
+    ("documentation", "docs"),
+    ("standards", "std"),
+    ("quality", "qual"),
+    ("security", "sec"),
+    ("error", "err"),
+    ("recovery", "rec"),
+    ("severity", "sev"),
+    ("optimization", "opt"),
+)
+
+# 기호 시스템: 로그에서 자주 보이는 형태만 일대일로 대응시킵니다.
+SYMBOLS: Tuple[Tuple[str, str], ...] = (
+    ("->", "→"),
+    ("=>", "⇒"),
+    ("<-", "←"),
+    ("<->", "⇄"),
+    (">>", "»"),
+    ("therefore", "∴"),
+    ("because", "∵"),
+    ("PASSED", "✅"),
+    ("FAILED", "❌"),
+    ("WARNING", "⚠️"),
+    ("CRITICAL", "🚨"),
+    ("pending", "⏳"),
+)
+
+
+def build_table() -> List[Tuple[str, str]]:
+    """압축 대응표 `(원문, 기호)`를 만듭니다."""
+    table: List[Tuple[str, str]] = []
+    for word, abbr in ABBREVIATIONS:
+        table.append((word, abbr))
+        table.append((word.capitalize(), abbr.capitalize()))
+        table.append((word.upper(), abbr.upper()))
+    table.extend(SYMBOLS)
+    return table
+
+
+def _alternation(words: Iterable[str]) -> str:
+    parts = []
+    for word in sorted(set(words), key=len, reverse=True):
+        escaped = re.escape(word)
+        if word[0].isalnum():
+            escaped = r"\b" + escaped
+        if word[-1].isalnum():
+            escaped = escaped + r"\b"
+        parts.append(escaped)
+    return "|".join(parts)
+
+
+@dataclass
+class StreamStats:
+    """스트림 하나의 측정값."""
+
+    in_bytes: int = 0
+    out_bytes: int = 0
+    in_tokens: int = 0
+    out_tokens: int = 0
+
+    @property
+    def reduction(self) -> float:
+        """토큰 감소율(0.0-1.0)."""
+        return 1.0 - self.out_tokens / self.in_tokens if self.in_tokens else 0.0
+
+    def to_json(self) -> dict:
+        return {**self.__dict__, "reduction": round(self.reduction, 4)}
+
+
+class StreamTransformer:
+    """정규식 치환을 청크 단위로 적용하는 변환기.
+
+    매치가 청크 경계에 걸리지 않도록 버퍼 끝의 `margin` 글자는 다음 청크까지
+    보류하며, 단어 경계(`\\b`)를 올바르게 판정하도록 확정한 부분의 마지막
+    한 글자를 문맥으로 남깁니다. 패턴은 줄바꿈을 포함하지 않으므로 마지막
+    줄바꿈까지는 청크가 다 차지 않아도 바로 확정합니다.
+    """
+
+    def __init__(self, pattern: "re.Pattern", replace: Callable[["re.Match"], str], margin: int,
+                 chunk_size: int = 1 << 16, tokenizer: Optional[str] = "heuristic"):
+        self.pattern = pattern
+        self.replace = replace
+        self.margin = margin + 1
+        self.chunk_size = chunk_size
+        self.stats = StreamStats()
+        self._count = get_tokenizer(tokenizer) if tokenizer else None
+        self._buf = ""
+        self._start = 0
+
+    def feed(self, data: str) -> str:
+        """입력 조각을 넣고 확정된 출력을 반환합니다."""
+        self._buf += data
+        limit = self._buf.rfind("\n", self._start) + 1
+        if len(self._buf) - self._start >= self.chunk_size + self.margin:
+            limit = max(limit, len(self._buf) - self.margin)
+        if limit <= self._start:
+            return ""
+        return self._drain(limit, final=False)
+
+    def close(self) -> str:
+        """남은 입력을 모두 처리하고 마지막 출력을 반환합니다."""
+        return self._drain(len(self._buf), final=True)
+
+    def _drain(self, limit: int, final: bool) -> str:
+        buf, start = self._buf, self._start
+        out: List[str] = []
+        pos = start
+        for match in self.pattern.finditer(buf, start):
+            if match.start() >= limit:
+                break
+            out.append(buf[pos:match.start()])
+            out.append(self.replace(match))
+            pos = match.end()
+        cut = len(buf) if final else max(pos, limit)
+        if not final and cut > pos and not buf[cut - 1].isspace():
+            # 토큰 수가 청크 경계에서 갈라지지 않도록 공백 뒤에서 자릅니다.
+            space = max(buf.rfind(" ", pos, cut), buf.rfind("\n", pos, cut))
+            if space >= pos:
+                cut = space + 1
+        out.append(buf[pos:cut])
+        result = "".join(out)
+        consumed = buf[start:cut]
+        self._record(consumed, result)
+        if cut > 0:
+            self._buf = buf[cut - 1:]
+            self._start = 1
+        return result
+
+    def _record(self, consumed: str, produced: str) -> None:
+        self.stats.in_bytes += len(consumed.encode("utf-8", "surrogateescape"))
+        self.stats.out_bytes += len(produced.encode("utf-8", "surrogateescape"))
+        if self._count is not None:
+            self.stats.in_tokens += self._count(consumed)
+            self.stats.out_tokens += self._count(produced)
+
+
+def compressor(table: Optional[List[Tuple[str, str]]] = None, **kwargs) -> StreamTransformer:
+    """원문 → 기호 방향의 변환기를 만듭니다."""
+    table = table or build_table()
+    forward = dict(table)
+    targets = set(forward.values())
+    pattern = re.compile(f"(?P<esc>{re.escape(ESCAPE)})|(?P<src>{_alternation(forward)})|(?P<dst>{_alternation(targets)})")
+
+    def replace(match: "re.Match") -> str:
+        if match.group("esc"):
+            return ESCAPE + ESCAPE
+        if match.group("src"):
+            return forward[match.group("src")]
+        return ESCAPE + match.group("dst")
+
+    margin = max(len(word) for pair in table for word in pair) + 1
+    return StreamTransformer(pattern, replace, margin, **kwargs)
+
+
+def expander(table: Optional[List[Tuple[str, str]]] = None, **kwargs) -> StreamTransformer:
+    """기호 → 원문 방향의 변환기를 만듭니다."""
+    table = table or build_table()
+    reverse: Dict[str, str] = {dst: src for src, dst in table}
+    literal = "|".join(re.escape(t) for t in sorted(reverse, key=len, reverse=True))
+    esc = re.escape(ESCAPE)
+    pattern = re.compile(f"{esc}(?P<lit>{esc}|{literal})|(?P<dst>{_alternation(reverse)})")
+
+    def replace(match: "re.Match") -> str:
+        if match.group("lit") is not None:
+            return match.group("lit")
+        return reverse[match.group("dst")]
+
+    margin = max(len(t) for t in reverse) + len(ESCAPE) + 1
+    return StreamTransformer(pattern, replace, margin, **kwargs)
+
+
+def transform(chunks: Iterable[str], transformer: StreamTransformer) -> Iterator[str]:
+    """입력 청크를 변환기에 흘려보내며 출력 청크를 생성합니다."""
+    for chunk in chunks:
+        out = transformer.feed(chunk)
+        if out:
+            yield out
+    out = transformer.close()
+    if out:
+        yield out
+
+
+def read_chunks(fh: BinaryIO, size: int = 1 << 16, errors: str = "surrogateescape") -> Iterator[str]:
+    """바이너리 입력을 도착한 만큼씩 읽어 UTF-8로 디코딩합니다. 청크가 찰 때까지 기다리지 않습니다."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors)
+    read = getattr(fh, "read1", fh.read)
+    while True:
+        data = read(size)
+        if not data:
+            break
+        text = decoder.decode(data)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+class RoundTripChecker:
+    """원문과 복원본을 스트리밍으로 비교합니다. 보류분만 메모리에 둡니다."""
+
+    def __init__(self):
+        self._left = ""
+        self._right = ""
+        self.offset = 0
+        self.mismatch: Optional[int] = None
+
+    def feed(self, original: str = "", restored: str = "") -> None:
+        if self.mismatch is not None:
+            return
+        self._left += original
+        self._right += restored
+        n = min(len(self._left), len(self._right))
+        if self._left[:n] != self._right[:n]:
+            i = next(i for i in range(n) if self._left[i] != self._right[i])
+            self.mismatch = self.offset + i
+            return
+        self._left, self._right = self._left[n:], self._right[n:]
+        self.offset += n
+
+    def ok(self) -> bool:
+        return self.mismatch is None and not self._left and not self._right
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="sgtools.compress", description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", help="입력 파일 (기본값: 표준 입력)")
+    parser.add_argument("--expand", action="store_true", help="압축된 입력을 원문으로 복원합니다")
+    parser.add_argument("--stats", action="store_true", help="토큰 감소율을 표준 오류로 출력합니다")
+    parser.add_argument("--check-roundtrip", action="store_true",
+                        help="복원 결과가 원문과 같은지 스트리밍으로 검증합니다. --expand와 함께 쓰면 "
+                             "다시 압축한 결과가 입력과 같은지 확인합니다 (출력 없음)")
+    parser.add_argument("--tokenizer", default="heuristic", help="토큰 측정에 쓸 토크나이저")
+    parser.add_argument("--chunk-size", type=int, default=1 << 16, help="처리 청크 크기(글자)")
+    parser.add_argument("--errors", choices=ERROR_POLICIES, default="surrogateescape",
+                        help="잘못된 UTF-8 바이트 처리 방식 (입력과 출력에 함께 적용)")
+    args = parser.parse_args(argv)
+
+    fh = open(args.input, "rb") if args.input else sys.stdin.buffer
+    out = sys.stdout.buffer
+    try:
+        make = expander if args.expand else compressor
+        transformer = make(chunk_size=args.chunk_size, tokenizer=args.tokenizer)
+        if args.check_roundtrip:
+            # 되돌리는 쪽은 항상 반대 방향입니다. `--expand`면 복원 결과를 다시 압축해
+            # 입력과 같은지 확인합니다.
+            back = (compressor if args.expand else expander)(chunk_size=args.chunk_size, tokenizer=None)
+            checker = RoundTripChecker()
+            for chunk in read_chunks(fh, args.chunk_size, args.errors):
+                checker.feed(original=chunk)
+                checker.feed(restored=back.feed(transformer.feed(chunk)))
+            checker.feed(restored=back.feed(transformer.close()) + back.close())
+            ok = checker.ok()
+            if not ok:
+                where = checker.mismatch if checker.mismatch is not None else checker.offset
+                print(f"FAIL: 복원 결과가 원문과 다릅니다 (오프셋 {where})", file=sys.stderr)
+        else:
+            ok = True
+            for text in transform(read_chunks(fh, args.chunk_size, args.errors), transformer):
+                out.write(text.encode("utf-8", args.errors))
+                out.flush()
+    finally:
+        if args.input:
+            fh.close()
+    if args.stats or args.check_roundtrip:
+        print(json.dumps(transformer.stats.to_json()), file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""GEMINI.md `@` 가져오기 그래프 컴파일러.
+
+세션 시작 시 `GEMINI.md`가 `@FLAGS_ko.md` 같은 가져오기를 매번 다시 풀어내는
+대신, 가져오기 그래프를 한 번 순회하여 하나의 번들 파일로 미리 컴파일합니다.
+
+- 가져오기 규칙: 줄 전체가 `@<경로>`인 줄만 가져오기로 취급합니다.
+  HTML 주석(`<!-- @X.md -->`)과 코드 블록 안의 줄은 무시합니다.
+- 경로는 가져오는 파일의 디렉토리를 기준으로 해석합니다.
+- 순환 가져오기와 누락된 파일은 오류로 보고합니다.
+- 번들은 파일별 내용 해시(sha256)를 키로 저장하며, 입력이 바뀐 파일만 다시
+  파싱합니다. 모든 입력의 크기/mtime이 그대로면 번들 파일 한 번 읽기로 끝납니다.
+
+사용법::
+
+    python -m sgtools.context [--root .gemini/GEMINI.md] [--output FILE] [--graph]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from . import CACHE_DIR_NAME
+
+BUNDLE_VERSION = 1
+BUNDLE_FILE_NAME = "context-bundle.json"
+
+IMPORT_RE = re.compile(r"^[ \t]*@(?P<path>[^\s@][^\s]*)[ \t]*$")
+FENCE_RE = re.compile(r"^[ \t]*(```|~~~)")
+
+
+class ContextError(Exception):
+    """컨텍스트 컴파일 오류의 기본 클래스."""
+
+
+class ImportCycleError(ContextError):
+    """가져오기 그래프에 순환이 있을 때 발생합니다."""
+
+    def __init__(self, chain: List[str]):
+        self.chain = chain
+        super().__init__("순환 가져오기: " + " -> ".join(chain))
+
+
+class MissingImportError(ContextError):
+    """가져오는 파일이 존재하지 않을 때 발생합니다."""
+
+    def __init__(self, importer: str, target: str):
+        self.importer = importer
+        self.target = target
+        super().__init__(f"{importer}: 가져올 파일이 없습니다: {target}")
+
+
+@dataclass
+class FileEntry:
+    """번들에 저장되는 파일 하나의 파싱 결과.
+
+    `parts`는 `["text", 문자열]` 또는 `["import", 상대경로]` 항목의 목록입니다.
+    """
+
+    sha256: str
+    size: int
+    mtime_ns: int
+    parts: List[list]
+
+    @property
+    def imports(self) -> List[str]:
+        return [value for kind, value in self.parts if kind == "import"]
+
+    def to_json(self) -> dict:
+        return {
+            "sha256": self.sha256,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "parts": self.parts,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "FileEntry":
+        return cls(data["sha256"], data["size"], data["mtime_ns"], data["parts"])
+
+
+@dataclass
+class Bundle:
+    """컴파일된 컨텍스트 번들."""
+
+    root: str
+    files: Dict[str, FileEntry]
+    order: List[str]
+    digest: str
+    text: str
+    rebuilt: List[str] = field(default_factory=list)
+
+    def to_json(self) -> dict:
+        return {
+            "version": BUNDLE_VERSION,
+            "root": self.root,
+            "digest": self.digest,
+            "order": self.order,
+            "files": {name: entry.to_json() for name, entry in self.files.items()},
+            "text": self.text,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Bundle":
+        files = {name: FileEntry.from_json(v) for name, v in data["files"].items()}
+        return cls(data["root"], files, data["order"], data["digest"], data["text"])
+
+
+def default_cache_path(root: str) -> str:
+    """루트 문서 옆의 `.cache/context-bundle.json` 경로를 반환합니다."""
+    return os.path.join(os.path.dirname(os.path.abspath(root)), CACHE_DIR_NAME, BUNDLE_FILE_NAME)
+
+
+def parse_imports(text: str, base: str) -> List[list]:
+    """문서를 텍스트 조각과 가져오기 항목으로 나눕니다.
+
+    `base`는 가져오는 파일의 (루트 기준) 디렉토리이며, 가져오기 경로는 이를
+    기준으로 정규화됩니다.
+    """
+    parts: List[list] = []
+    buf: List[str] = []
+    in_fence = False
+    in_comment = False
+    for line in text.splitlines(keepends=True):
+        if in_comment:
+            buf.append(line)
+            if "-->" in line:
+                in_comment = False
+            continue
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            buf.append(line)
+            continue
+        if not in_fence:
+            start = line.rfind("<!--")
+            if start != -1 and "-->" not in line[start:]:
+                in_comment = True
+            match = IMPORT_RE.match(line)
+            if match:
+                if buf:
+                    parts.append(["text", "".join(buf)])
+                    buf = []
+                target = os.path.normpath(os.path.join(base, match.group("path")))
+                parts.append(["import", target.replace(os.sep, "/")])
+                continue
+        buf.append(line)
+    if buf:
+        parts.append(["text", "".join(buf)])
+    return parts
+
+
+def _read_entry(path: str, name: str, cached: Optional[FileEntry]) -> Tuple[FileEntry, bool]:
+    """파일 항목을 반환합니다. 두 번째 값은 다시 파싱했는지 여부입니다."""
+    st = os.stat(path)
+    if cached is not None and cached.size == st.st_size and cached.mtime_ns == st.st_mtime_ns:
+        return cached, False
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    sha = hashlib.sha256(raw).hexdigest()
+    if cached is not None and cached.sha256 == sha:
+        return FileEntry(sha, st.st_size, st.st_mtime_ns, cached.parts), False
+    base = os.path.dirname(name)
+    parts = parse_imports(raw.decode("utf-8"), base)
+    return FileEntry(sha, st.st_size, st.st_mtime_ns, parts), True
+
+
+def _walk(root_dir: str, root_name: str, cached: Dict[str, FileEntry]):
+    files: Dict[str, FileEntry] = {}
+    order: List[str] = []
+    rebuilt: List[str] = []
+    stack: List[str] = []
+
+    def visit(name: str, importer: Optional[str]) -> None:
+        if name in stack:
+            raise ImportCycleError(stack[stack.index(name):] + [name])
+        if name in files:
+            return
+        path = os.path.join(root_dir, name)
+        if not os.path.isfile(path):
+            if importer is None:
+                raise ContextError(f"루트 문서가 없습니다: {path}")
+            raise MissingImportError(importer, name)
+        entry, changed = _read_entry(path, name, cached.get(name))
+        if changed:
+            rebuilt.append(name)
+        stack.append(name)
+        for target in entry.imports:
+            visit(target, name)
+        stack.pop()
+        files[name] = entry
+        order.append(name)
+
+    visit(root_name, None)
+    return files, order, rebuilt
+
+
+def assemble(files: Dict[str, FileEntry], root_name: str, exclude=()) -> str:
+    """가져오기를 펼쳐 하나의 문서로 조립합니다.
+
+    같은 파일을 여러 번 가져오면 처음 한 번만 펼칩니다. `exclude`에 있는
+    파일은 가져오기 줄과 함께 생략됩니다.
+    """
+    out: List[str] = []
+    seen = set()
+
+    def emit(name: str) -> None:
+        seen.add(name)
+        for kind, value in files[name].parts:
+            if kind == "text":
+                out.append(value)
+            elif value not in seen and value not in exclude:
+                emit(value)
+                if out and not out[-1].endswith("\n"):
+                    out.append("\n")
+
+    emit(root_name)
+    return "".join(out)
+
+
+def _digest(files: Dict[str, FileEntry], order: List[str]) -> str:
+    h = hashlib.sha256()
+    for name in order:
+        h.update(name.encode("utf-8"))
+        h.update(b"\0")
+        h.update(files[name].sha256.encode("ascii"))
+    return h.hexdigest()
+
+
+def load_bundle(cache_path: str) -> Optional[Bundle]:
+    """캐시된 번들을 읽습니다. 없거나 형식이 다르면 None을 반환합니다."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != BUNDLE_VERSION:
+        return None
+    return Bundle.from_json(data)
+
+
+def _is_fresh(bundle: Bundle, root_dir: str) -> bool:
+    for name in bundle.order:
+        entry = bundle.files[name]
+        try:
+            st = os.stat(os.path.join(root_dir, name))
+        except OSError:
+            return False
+        if st.st_size != entry.size or st.st_mtime_ns != entry.mtime_ns:
+            return False
+    return True
+
+
+def _write_atomic(path: str, data: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def compile_context(root: str, cache_path: Optional[str] = None, use_cache: bool = True) -> Bundle:
+    """`root` 문서를 컴파일하고 번들을 반환합니다.
+
+    캐시가 최신이면 번들 파일만 읽고 반환합니다(`rebuilt`가 빈 목록).
+    그렇지 않으면 변경된 파일만 다시 파싱하고 번들을 갱신합니다.
+    """
+    root = os.path.abspath(root)
+    root_dir, root_name = os.path.split(root)
+    if cache_path is None:
+        cache_path = default_cache_path(root)
+
+    cached = load_bundle(cache_path) if use_cache else None
+    if cached is not None and cached.root == root_name and _is_fresh(cached, root_dir):
+        return cached
+
+    files, order, rebuilt = _walk(root_dir, root_name, cached.files if cached else {})
+    digest = _digest(files, order)
+    if cached is not None and cached.digest == digest and cached.root == root_name:
+        text = cached.text
+    else:
+        text = assemble(files, root_name)
+    bundle = Bundle(root_name, files, order, digest, text, rebuilt)
+    if use_cache:
+        _write_atomic(cache_path, json.dumps(bundle.to_json(), ensure_ascii=False))
+    return bundle
+
+
+def find_root(start: Optional[str] = None) -> str:
+    """현재 디렉토리에서 위로 올라가며 `.gemini/GEMINI.md`를 찾습니다."""
+    path = os.path.abspath(start or os.getcwd())
+    while True:
+        candidate = os.path.join(path, ".gemini", "GEMINI.md")
+        if os.path.isfile(candidate):
+            return candidate
+        if os.path.basename(path) == ".gemini" and os.path.isfile(os.path.join(path, "GEMINI.md")):
+            return os.path.join(path, "GEMINI.md")
+        parent = os.path.dirname(path)
+        if parent == path:
+            raise ContextError("`.gemini/GEMINI.md`를 찾을 수 없습니다")
+        path = parent
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="sgtools.context", description=__doc__.splitlines()[0])
+    parser.add_argument("--root", help="루트 문서 (기본값: 가장 가까운 .gemini/GEMINI.md)")
+    parser.add_argument("--cache", help="번들 경로 (기본값: .gemini/.cache/context-bundle.json)")
+    parser.add_argument("--output", "-o", help="조립된 문서를 쓸 파일 ('-'는 표준 출력)")
+    parser.add_argument("--no-cache", action="store_true", help="캐시를 읽거나 쓰지 않습니다")
+    parser.add_argument("--graph", action="store_true", help="가져오기 그래프를 출력합니다")
+    args = parser.parse_args(argv)
+
+    try:
+        root = args.root or find_root()
+        bundle = compile_context(root, args.cache, use_cache=not args.no_cache)
+    except ContextError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.graph:
+        for name in bundle.order:
+            entry = bundle.files[name]
+            print(f"{name} ({entry.size} B, {entry.sha256[:12]})")
+            for target in entry.imports:
+                print(f"  -> {target}")
+    if args.output == "-":
+        sys.stdout.write(bundle.text)
+    elif args.output:
+        _write_atomic(os.path.abspath(args.output), bundle.text)
+    if not args.graph and not args.output:
+        state = "rebuilt: " + ", ".join(bundle.rebuilt) if bundle.rebuilt else "cache hit"
+        print(f"{bundle.digest[:12]} {len(bundle.order)} files, {len(bundle.text.encode('utf-8'))} B ({state})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+"""`--delegate`/`--concurrency`의 로컬 스케줄러.
+
+`FLAGS_ko.md`의 `--delegate [auto|files|folders]`와 `--concurrency [n]`(1-15)
+의미를 SuperAgent MCP 없이 로컬에서 구현합니다.
+
+- 위임 조건: 디렉토리 7개 이상, 파일 50개 이상, 또는 복잡도 0.8 초과.
+- 분할: 파일 바이트 크기를 기준으로 샤드를 만듭니다. `folders` 모드도 목표
+  크기보다 큰 폴더는 하위 폴더/파일 묶음으로 다시 나누므로, 거대한 폴더 하나
+  때문에 나머지 작업자가 놀지 않습니다. `auto`는 폴더 분할이 균형을 이루면
+  `folders`, 아니면 `files`를 고릅니다.
+- 실행: 작업자마다 덱을 두고 큰 샤드부터 배정(LPT)한 뒤, 자기 덱이 비면 남은
+  작업량이 가장 많은 작업자의 덱 끝에서 샤드를 훔칩니다.
+- 하위 에이전트: 기본값은 파일을 읽어 줄/바이트를 세는 로컬 대역이며,
+  `--agent-cmd`로 샤드 파일 목록을 표준 입력으로 받는 외부 명령을 쓸 수 있습니다.
+
+사용법::
+
+    python -m sgtools.delegate [경로] [--delegate auto|files|folders] [--concurrency N] [--json]
+"""
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 15
+DEFAULT_CONCURRENCY = 4
+DELEGATE_MODES = ("auto", "files", "folders")
+
+# FLAGS_ko.md: 디렉토리 7개 이상 또는 파일 50개 이상 또는 복잡도 0.8 초과
+DELEGATE_MIN_DIRECTORIES = 7
+DELEGATE_MIN_FILES = 50
+DELEGATE_MIN_COMPLEXITY = 0.8
+
+# 작업자당 샤드 수. 훔칠 여지를 남기도록 작업자 수보다 잘게 나눕니다.
+SHARDS_PER_WORKER = 4
+
+IGNORED_DIRS = frozenset({".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+                          ".tox", ".nox", ".cache", ".memory", ".mypy_cache", ".pytest_cache"})
+
+
+@dataclass
+class FileInfo:
+    path: str  # 루트 기준 상대 경로 (posix)
+    size: int
+
+
+@dataclass
+class Shard:
+    """하위 에이전트 하나에 넘기는 작업 단위."""
+
+    id: int
+    label: str
+    files: List[FileInfo]
+
+    @property
+    def bytes(self) -> int:
+        return sum(f.size for f in self.files)
+
+
+@dataclass
+class ShardResult:
+    shard: Shard
+    worker: int
+    started: float
+    finished: float
+    stolen: bool
+    output: object = None
+    error: Optional[str] = None
+
+    @property
+    def latency_ms(self) -> float:
+        return (self.finished - self.started) * 1000.0
+
+
+@dataclass
+class PoolReport:
+    workers: int
+    mode: str
+    wall_ms: float
+    busy_ms: List[float]
+    steals: int
+    results: List[ShardResult] = field(default_factory=list)
+
+    @property
+    def utilization(self) -> float:
+        """작업자 바쁜 시간 합 / (작업자 수 × 전체 시간)."""
+        if not self.wall_ms:
+            return 0.0
+        return sum(self.busy_ms) / (self.workers * self.wall_ms)
+
+
+def scan(root: str) -> List[FileInfo]:
+    """`root` 아래의 파일 목록을 크기와 함께 반환합니다."""
+    files: List[FileInfo] = []
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        try:
+            entries = list(os.scandir(os.path.join(root, rel)))
+        except OSError:
+            continue
+        for entry in entries:
+            path = f"{rel}/{entry.name}" if rel else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in IGNORED_DIRS:
+                    stack.append(path)
+            elif entry.is_file(follow_symlinks=False):
+                files.append(FileInfo(path, entry.stat(follow_symlinks=False).st_size))
+    files.sort(key=lambda f: f.path)
+    return files
+
+
+def directory_count(files: List[FileInfo]) -> int:
+    dirs = set()
+    for f in files:
+        parts = f.path.split("/")[:-1]
+        for i in range(1, len(parts) + 1):
+            dirs.add("/".join(parts[:i]))
+    return len(dirs)
+
+
+def should_delegate(files: int, directories: int, complexity: Optional[float] = None) -> bool:
+    """`--delegate` 자동 활성화 조건."""
+    return (
+        directories >= DELEGATE_MIN_DIRECTORIES
+        or files >= DELEGATE_MIN_FILES
+        or (complexity is not None and complexity > DELEGATE_MIN_COMPLEXITY)
+    )
+
+
+def _pack(files: List[FileInfo], target: int) -> List[List[FileInfo]]:
+    """파일을 목표 크기 근처의 묶음으로 나눕니다(큰 파일 우선 first-fit)."""
+    bins: List[Tuple[int, List[FileInfo]]] = []
+    for f in sorted(files, key=lambda f: (-f.size, f.path)):
+        for i, (size, members) in enumerate(bins):
+            if size + f.size <= target:
+                members.append(f)
+                bins[i] = (size + f.size, members)
+                break
+        else:
+            bins.append((f.size, [f]))
+    return [sorted(members, key=lambda f: f.path) for _, members in bins]
+
+
+def _group_by_child(files: List[FileInfo], prefix: str) -> Tuple[Dict[str, List[FileInfo]], List[FileInfo]]:
+    """`prefix` 바로 아래 폴더별 파일과, `prefix`에 직접 있는 파일로 나눕니다."""
+    groups: Dict[str, List[FileInfo]] = {}
+    loose: List[FileInfo] = []
+    depth = prefix.count("/") + 1 if prefix else 0
+    for f in files:
+        parts = f.path.split("/")
+        if len(parts) - 1 > depth:
+            groups.setdefault("/".join(parts[:depth + 1]), []).append(f)
+        else:
+            loose.append(f)
+    return groups, loose
+
+
+def partition_folders(files: List[FileInfo], target: int) -> List[Tuple[str, List[FileInfo]]]:
+    """폴더 단위로 나누되, 목표보다 큰 폴더는 재귀적으로 더 나눕니다."""
+    shards: List[Tuple[str, List[FileInfo]]] = []
+
+    def split(prefix: str, members: List[FileInfo]) -> None:
+        groups, loose = _group_by_child(members, prefix)
+        for name in sorted(groups):
+            group = groups[name]
+            if sum(f.size for f in group) <= target:
+                shards.append((name + "/", group))
+            else:
+                split(name, group)
+        for pack in _pack(loose, target):
+            label = (prefix or ".") + ("/*" if len(pack) > 1 else "/" + pack[0].path.rsplit("/", 1)[-1])
+            shards.append((label, pack))
+
+    split("", files)
+    return shards
+
+
+def partition_files(files: List[FileInfo], target: int) -> List[Tuple[str, List[FileInfo]]]:
+    return [(f"files[{len(pack)}]", pack) for pack in _pack(files, target)]
+
+
+def partition(files: List[FileInfo], mode: str, workers: int) -> Tuple[str, List[Shard]]:
+    """`mode`에 따라 샤드를 만듭니다. `auto`면 실제로 고른 모드를 함께 반환합니다."""
+    total = sum(f.size for f in files)
+    target = max(1, total // max(1, workers * SHARDS_PER_WORKER))
+    if mode == "auto":
+        top_groups, _ = _group_by_child(files, "")
+        largest = max((sum(f.size for f in g) for g in top_groups.values()), default=0)
+        balanced = len(top_groups) >= workers and largest <= total / workers
+        mode = "folders" if balanced else "files"
+    raw = partition_folders(files, target) if mode == "folders" else partition_files(files, target)
+    return mode, [Shard(i, label, members) for i, (label, members) in enumerate(raw)]
+
+
+class WorkStealingPool:
+    """작업자별 덱과 작업 훔치기를 사용하는 고정 크기 스레드 풀."""
+
+    def __init__(self, workers: int):
+        if not MIN_CONCURRENCY <= workers <= MAX_CONCURRENCY:
+            raise ValueError(f"concurrency는 {MIN_CONCURRENCY}-{MAX_CONCURRENCY} 범위여야 합니다: {workers}")
+        self.workers = workers
+        self._queues: List[deque] = [deque() for _ in range(workers)]
+        self._remaining = [0] * workers
+        self._lock = threading.Lock()
+
+    def _distribute(self, shards: List[Shard]) -> None:
+        # LPT: 큰 샤드부터 남은 작업량이 가장 적은 작업자에게 배정합니다.
+        for shard in sorted(shards, key=lambda s: -s.bytes):
+            i = min(range(self.workers), key=lambda w: self._remaining[w])
+            self._queues[i].append(shard)
+            self._remaining[i] += shard.bytes
+
+    def _take(self, worker: int) -> Tuple[Optional[Shard], bool]:
+        with self._lock:
+            if self._queues[worker]:
+                shard = self._queues[worker].popleft()
+                self._remaining[worker] -= shard.bytes
+                return shard, False
+            victims = [w for w in range(self.workers) if self._queues[w]]
+            if not victims:
+                return None, False
+            victim = max(victims, key=lambda w: self._remaining[w])
+            shard = self._queues[victim].pop()
+            self._remaining[victim] -= shard.bytes
+            return shard, True
+
+    def run(self, shards: List[Shard], agent: Callable[[Shard], object], mode: str = "") -> PoolReport:
+        self._distribute(shards)
+        results: List[ShardResult] = []
+        busy = [0.0] * self.workers
+        steals = [0] * self.workers
+
+        def work(worker: int) -> None:
+            while True:
+                shard, stolen = self._take(worker)
+                if shard is None:
+                    return
+                started = time.perf_counter()
+                output, error = None, None
+                try:
+                    output = agent(shard)
+                except Exception as exc:  # 하위 에이전트 실패는 샤드 결과로 보고합니다
+                    error = f"{type(exc).__name__}: {exc}"
+                finished = time.perf_counter()
+                busy[worker] += (finished - started) * 1000.0
+                steals[worker] += stolen
+                with self._lock:
+                    results.append(ShardResult(shard, worker, started, finished, stolen, output, error))
+
+        began = time.perf_counter()
+        threads = [threading.Thread(target=work, args=(w,), daemon=True) for w in range(self.workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = (time.perf_counter() - began) * 1000.0
+        results.sort(key=lambda r: r.shard.id)
+        return PoolReport(self.workers, mode, wall, busy, sum(steals), results)
+
+
+def local_agent(root: str) -> Callable[[Shard], dict]:
+    """파일을 읽어 줄 수와 바이트 수를 세는 로컬 대역 하위 에이전트."""
+
+    def run(shard: Shard) -> dict:
+        lines = size = 0
+        for f in shard.files:
+            with open(os.path.join(root, f.path), "rb") as fh:
+                for block in iter(lambda: fh.read(1 << 16), b""):
+                    lines += block.count(b"\n")
+                    size += len(block)
+        return {"files": len(shard.files), "lines": lines, "bytes": size}
+
+    return run
+
+
+def command_agent(root: str, command: str) -> Callable[[Shard], dict]:
+    """샤드 파일 목록을 표준 입력으로 외부 명령에 넘기는 하위 에이전트."""
+    argv = shlex.split(command)
+
+    def run(shard: Shard) -> dict:
+        env = dict(os.environ, SG_SHARD_ID=str(shard.id), SG_SHARD_LABEL=shard.label)
+        proc = subprocess.run(
+            argv, input="\n".join(f.path for f in shard.files) + "\n", cwd=root, env=env,
+            capture_output=True, text=True, check=False,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"exit {proc.returncode}: {proc.stderr.strip()[:200]}")
+        return {"stdout": proc.stdout}
+
+    return run
+
+
+def render(report: PoolReport) -> str:
+    lines = [f"{'id':>4} {'worker':>6} {'files':>6} {'bytes':>10} {'ms':>9}  label"]
+    for r in report.results:
+        mark = " (stolen)" if r.stolen else ""
+        err = f"  ERROR {r.error}" if r.error else ""
+        lines.append(f"{r.shard.id:>4} {r.worker:>6} {len(r.shard.files):>6} {r.shard.bytes:>10} "
+                     f"{r.latency_ms:>9.1f}  {r.shard.label}{mark}{err}")
+    lines.append(
+        f"mode={report.mode} workers={report.workers} shards={len(report.results)} "
+        f"wall={report.wall_ms:.1f}ms utilization={report.utilization * 100:.1f}% steals={report.steals}"
+    )
+    return "\n".join(lines)
+
+
+def report_json(report: PoolReport) -> dict:
+    return {
+        "mode": report.mode,
+        "workers": report.workers,
+        "wall_ms": round(report.wall_ms, 3),
+        "utilization": round(report.utilization, 4),
+        "steals": report.steals,
+        "busy_ms": [round(b, 3) for b in report.busy_ms],
+        "shards": [
+            {"id": r.shard.id, "label": r.shard.label, "files": len(r.shard.files), "bytes": r.shard.bytes,
+             "worker": r.worker, "latency_ms": round(r.latency_ms, 3), "stolen": r.stolen,
+             "error": r.error, "output": r.output}
+            for r in report.results
+        ],
+    }
+
+
+def _concurrency(value: str) -> int:
+    n = int(value)
+    if not MIN_CONCURRENCY <= n <= MAX_CONCURRENCY:
+        raise argparse.ArgumentTypeError(f"{MIN_CONCURRENCY}-{MAX_CONCURRENCY} 범위여야 합니다")
+    return n
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="sgtools.delegate", description=__doc__.splitlines()[0])
+    parser.add_argument("root", nargs="?", default=".", help="분할할 저장소 경로")
+    parser.add_argument("--delegate", choices=DELEGATE_MODES, default="auto")
+    parser.add_argument("--concurrency", type=_concurrency, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--complexity", type=float, help="자동 위임 판단에 쓸 복잡도 점수")
+    parser.add_argument("--force", action="store_true", help="위임 조건을 만족하지 않아도 실행합니다")
+    parser.add_argument("--agent-cmd", help="샤드마다 실행할 하위 에이전트 명령 (파일 목록을 표준 입력으로 받음)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력합니다")
+    args = parser.parse_args(argv)
+
+    root = os.path.abspath(args.root)
+    files = scan(root)
+    dirs = directory_count(files)
+    if not args.force and not should_delegate(len(files), dirs, args.complexity):
+        print(f"delegation not triggered: {len(files)} files, {dirs} directories "
+              f"(needs >= {DELEGATE_MIN_FILES} files, >= {DELEGATE_MIN_DIRECTORIES} directories "
+              f"or complexity > {DELEGATE_MIN_COMPLEXITY}); use --force", file=sys.stderr)
+        return 0
+    mode, shards = partition(files, args.delegate, args.concurrency)
+    agent = command_agent(root, args.agent_cmd) if args.agent_cmd else local_agent(root)
+    report = WorkStealingPool(args.concurrency).run(shards, agent, mode)
+    if args.json:
+        print(json.dumps(report_json(report), ensure_ascii=False, indent=2))
+    else:
+        print(render(report))
+    return 1 if any(r.error for r in report.results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+"""`/sg:save`, `/sg:load`용 로컬 메모리 저장소와 MCP 서버.
+
+Serena MCP의 `write_memory`/`read_memory`/`list_memories`/`delete_memory`를
+오프라인으로 대체합니다. 저장소 형식은 `store` 모듈을 참고하세요.
+"""
+
+from .store import MemoryStore, MemoryStoreError, default_store_path
+
+__all__ = ["MemoryStore", "MemoryStoreError", "default_store_path"]
@@ -0,0 +1,287 @@
+"""내용 주소 청크 기반 체크포인트 저장소.
+
+체크포인트 본문을 내용 정의 청킹(gear 해시)으로 나누고 청크를 sha256으로
+주소 지정하여 `<저장소>/chunks/`에 zlib 압축으로 저장합니다. 이전 체크포인트와
+같은 청크는 다시 쓰지 않으므로, 각 체크포인트가 디스크에 추가하는 것은 직전
+체크포인트 대비 바뀐 청크(델타)뿐입니다.
+
+매니페스트(청크 목록)는 메모리 저장소의 `checkpoint_<id>` 키에 저장됩니다.
+따라서 `delete_memory("checkpoint_*")`로 체크포인트를 정리할 수 있고,
+`gc()`가 어떤 매니페스트도 참조하지 않는 청크를 제거합니다. 복원은 매니페스트
+하나를 읽고 필요한 청크만 순서대로 스트리밍하므로, 체크포인트 개수나 부모
+체인 길이와 무관하게 해당 체크포인트 크기에만 비례합니다.
+
+최신 체크포인트 포인터와 GC 통계는 메모리 키가 아니라 `chunks/state.json`에
+두므로 `list_memories`나 `delete_memory("checkpoint_*")`에 드러나지 않습니다.
+생성 비용도 기존 체크포인트 개수와 무관합니다. 같은 키로 덮어써서 고아가 될 수
+있는 청크는 바로 지우지 않고 양만 기록해 두었다가, 그 양이 살아 있는 청크의
+일정 비율을 넘을 때 `gc()`를 실행합니다. 전체를 훑는 GC 비용이 그만큼의 덮어쓰기에
+나뉘므로 덮어쓰기당 비용은 상수로 유지됩니다.
+"""
+
+import hashlib
+import json
+import os
+import random
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from .store import MemoryStore, MemoryStoreError
+
+CHECKPOINT_PREFIX = "checkpoint_"
+MANIFEST_FORMAT = "sgcheckpoint/1"
+# `load_checkpoint`에서 최신 체크포인트를 뜻하는 별칭. 체크포인트 키로는 쓸 수 없습니다.
+LATEST_ALIAS = CHECKPOINT_PREFIX + "latest"
+STATE_FILE_NAME = "state.json"
+
+# 덮어쓰기로 생긴 고아 후보가 살아 있는 청크 바이트의 이 비율(최소 GC_MIN_GARBAGE)을
+# 넘으면 GC를 실행합니다.
+GC_GARBAGE_RATIO = 0.5
+GC_MIN_GARBAGE = 1 << 20
+
+MIN_CHUNK = 512
+AVG_CHUNK_BITS = 11  # 평균 약 2 KiB
+MAX_CHUNK = 8192
+
+_rng = random.Random(0x5347)
+_GEAR = [_rng.getrandbits(32) for _ in range(256)]
+del _rng
+_MASK = ((1 << AVG_CHUNK_BITS) - 1) << (32 - AVG_CHUNK_BITS)
+
+
+def chunk_boundaries(data: bytes) -> Iterator[int]:
+    """내용 정의 청크의 끝 위치를 차례로 반환합니다."""
+    n = len(data)
+    gear = _GEAR
+    start = 0
+    while start < n:
+        end = min(start + MAX_CHUNK, n)
+        cut = end
+        h = 0
+        for i in range(start + MIN_CHUNK, end):
+            h = ((h << 1) + gear[data[i]]) & 0xFFFFFFFF
+            if not h & _MASK:
+                cut = i + 1
+                break
+        yield cut
+        start = cut
+
+
+def is_manifest(value: Optional[str]) -> bool:
+    return bool(value) and value.startswith('{"format": "' + MANIFEST_FORMAT)
+
+
+@dataclass
+class CheckpointInfo:
+    """체크포인트 생성 결과."""
+
+    key: str
+    parent: Optional[str]
+    size: int
+    chunks: int
+    new_chunks: int
+    new_bytes: int
+    elapsed_ms: float
+
+
+class CheckpointStore:
+    """`MemoryStore`에 매니페스트를 두는 체크포인트 저장소."""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+        self.chunk_dir = os.path.join(store.path, "chunks")
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.chunk_dir, STATE_FILE_NAME)
+
+    def _load_state(self) -> dict:
+        """`{"latest": 키, "garbage": 바이트, "live": 바이트}`. 없거나 손상되었으면 빈 사전."""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as fh:
+                state = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _save_state(self, state: dict) -> None:
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        tmp = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(state, fh, ensure_ascii=False)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.state_path)
+
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunk_dir, digest[:2], digest[2:])
+
+    def _put_chunk(self, digest: str, data: bytes) -> bool:
+        path = self._chunk_path(digest)
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(zlib.compress(data, 6))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+        return True
+
+    def _get_chunk(self, digest: str) -> bytes:
+        try:
+            with open(self._chunk_path(digest), "rb") as fh:
+                data = zlib.decompress(fh.read())
+        except FileNotFoundError:
+            raise MemoryStoreError(f"체크포인트 청크가 없습니다: {digest}") from None
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise MemoryStoreError(f"체크포인트 청크가 손상되었습니다: {digest}")
+        return data
+
+    # -- 매니페스트 ----------------------------------------------------
+
+    def keys(self) -> List[str]:
+        """매니페스트가 있는 체크포인트 키 목록(생성 순)."""
+        manifests = [(key, self.manifest(key)) for key in self.store.keys(CHECKPOINT_PREFIX + "*")]
+        manifests = [(m["created"], key) for key, m in manifests if m is not None]
+        return [key for _, key in sorted(manifests)]
+
+    def manifest(self, key: str) -> Optional[dict]:
+        value = self.store.get(key)
+        if not is_manifest(value):
+            return None
+        return json.loads(value)
+
+    def latest(self) -> Optional[str]:
+        """최신 체크포인트 키. 포인터가 가리키는 체크포인트가 지워졌으면 전체를 살펴봅니다."""
+        key = self._load_state().get("latest")
+        if key and is_manifest(self.store.get(key)):
+            return key
+        keys = self.keys()
+        return keys[-1] if keys else None
+
+    def new_key(self) -> str:
+        key = CHECKPOINT_PREFIX + time.strftime("%Y%m%dT%H%M%S")
+        candidate, n = key, 1
+        while candidate in self.store:
+            n += 1
+            candidate = f"{key}_{n}"
+        return candidate
+
+    # -- 생성/복원 -----------------------------------------------------
+
+    def create(self, content: str, key: Optional[str] = None) -> CheckpointInfo:
+        """`content`로 체크포인트를 만들고 새로 저장한 청크 통계를 반환합니다."""
+        started = time.perf_counter()
+        key = key or self.new_key()
+        if not key.startswith(CHECKPOINT_PREFIX):
+            raise MemoryStoreError(f"체크포인트 키는 '{CHECKPOINT_PREFIX}'로 시작해야 합니다: {key}")
+        if key == LATEST_ALIAS:
+            raise MemoryStoreError(f"{LATEST_ALIAS}는 최신 체크포인트의 별칭으로 예약되어 있습니다")
+        parent = self.latest()
+        previous = self.manifest(key)
+        data = content.encode("utf-8")
+        chunks: List[list] = []
+        new_chunks = new_bytes = 0
+        start = 0
+        for end in chunk_boundaries(data):
+            piece = data[start:end]
+            digest = hashlib.sha256(piece).hexdigest()
+            if self._put_chunk(digest, piece):
+                new_chunks += 1
+                new_bytes += len(piece)
+            chunks.append([digest, len(piece)])
+            start = end
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "created": time.time(),
+            "parent": parent if parent != key else None,
+            "size": len(data),
+            "chunks": chunks,
+        }
+        self.store.put(key, json.dumps(manifest))
+        self.store.flush()
+        state = self._load_state()
+        state["latest"] = key
+        state["live"] = state.get("live", 0) + new_bytes
+        if previous is not None:
+            # 덮어쓴 매니페스트에만 있던 청크는 다른 체크포인트가 참조할 수 있으므로
+            # 고아 후보의 양만 기록하고, 쌓인 양이 충분할 때 한 번에 회수합니다.
+            current = {digest for digest, _ in chunks}
+            dropped = {digest: size for digest, size in previous["chunks"] if digest not in current}
+            state["garbage"] = state.get("garbage", 0) + sum(dropped.values())
+        self._save_state(state)
+        if state.get("garbage", 0) >= max(GC_MIN_GARBAGE, state["live"] * GC_GARBAGE_RATIO):
+            self.gc()
+        elapsed = (time.perf_counter() - started) * 1000.0
+        return CheckpointInfo(key, manifest["parent"], len(data), len(chunks), new_chunks, new_bytes, elapsed)
+
+    def stream(self, key: str) -> Iterator[bytes]:
+        """체크포인트 본문을 청크 단위로 스트리밍합니다."""
+        manifest = self.manifest(key)
+        if manifest is None:
+            raise MemoryStoreError(f"체크포인트가 없습니다: {key}")
+        for digest, _size in manifest["chunks"]:
+            yield self._get_chunk(digest)
+
+    def restore(self, key: str) -> str:
+        return b"".join(self.stream(key)).decode("utf-8")
+
+    def delete(self, key: str) -> bool:
+        removed = self.store.delete(key)
+        self.store.flush()
+        return removed
+
+    def gc(self) -> Dict[str, int]:
+        """매니페스트가 참조하지 않는 청크를 삭제하고 고아 후보 통계를 초기화합니다."""
+        live: Dict[str, int] = {}
+        for key in self.store.keys(CHECKPOINT_PREFIX + "*"):
+            manifest = self.manifest(key)
+            if manifest is not None:
+                live.update((digest, size) for digest, size in manifest["chunks"])
+        removed = freed = 0
+        if not os.path.isdir(self.chunk_dir):
+            return {"removed": 0, "freed_bytes": 0, "live": len(live)}
+        for prefix in os.listdir(self.chunk_dir):
+            subdir = os.path.join(self.chunk_dir, prefix)
+            if not os.path.isdir(subdir):
+                continue
+            for name in os.listdir(subdir):
+                if prefix + name in live:
+                    continue
+                path = os.path.join(subdir, name)
+                freed += os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+        state = self._load_state()
+        state.update(garbage=0, live=sum(live.values()))
+        self._save_state(state)
+        return {"removed": removed, "freed_bytes": freed, "live": len(live)}
+
+
+def snapshot_memories(store: MemoryStore) -> str:
+    """체크포인트를 제외한 모든 메모리를 키 순서의 JSON 줄로 직렬화합니다.
+
+    키 순서가 고정되어 있어 바뀌지 않은 메모리는 같은 청크로 나뉘고 재사용됩니다.
+    """
+    lines = []
+    for key, value in store.items():
+        if key.startswith(CHECKPOINT_PREFIX):
+            continue
+        lines.append(json.dumps({"key": key, "value": value}, ensure_ascii=False))
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def parse_snapshot(content: str) -> Optional[Dict[str, str]]:
+    """`snapshot_memories` 형식이면 메모리 사전을, 아니면 None을 반환합니다."""
+    memories = {}
+    for line in content.splitlines():
+        try:
+            record = json.loads(line)
+            memories[record["key"]] = record["value"]
+        except (ValueError, TypeError, KeyError):
+            return None
+    return memories
@@ -0,0 +1,316 @@
+"""메모리 내용에 대한 역색인과 BM25 관련도 회상.
+
+`/sg:load`의 세션 복원은 `list_memories()` 뒤에 메모리를 통째로 읽으므로,
+오래된 프로젝트에서는 모든 plan/phase/task/decisions/blockers가 컨텍스트로
+돌아옵니다. `RecallIndex`는 질의와 관련된 메모리만 BM25 점수 순으로 골라
+토큰 예산 안에 들어가는 만큼만 돌려줍니다.
+
+메모리는 `RULES_ko.md`에 따라 한국어로 쓰이므로 형태소 분석 대신 문자
+n-그램(기본 2-그램)으로 토큰화합니다. "인증은", "인증을"처럼 조사가 붙은
+어절도 "인증" 2-그램을 공유하므로 질의와 일치합니다. 메모리 이름도 함께
+색인하여 `task_2.1` 같은 키로도 찾을 수 있습니다.
+
+색인은 `MemoryStore.observe()`로 쓰기/삭제마다 해당 메모리만 갱신하며,
+`<저장소>/recall.json`에 문서별 n-그램 빈도를 저장합니다. 스냅샷의
+`revision`이 저장소와 같으면 값을 다시 읽지 않고 그대로 쓰고, 다르면(비정상
+종료, 다른 도구의 쓰기) 한 번 다시 만듭니다. 회상을 한 번도 쓰지 않은 세션은
+색인을 읽지도 저장하지도 않으며, 이때 남은 스냅샷은 다음 질의에서 다시 만듭니다.
+
+질의 비용은 메모리 개수와 거의 무관합니다. 문서 절반 넘게 나오는 n-그램("하는",
+"니다" 등)은 질의에 더 드문 n-그램이 있으면 건너뜁니다(고전 BM25 idf가 음수가
+되는 구간). 나머지는 게시 목록이 짧은 n-그램부터 점수를 매기고, 상위 `limit`개가
+채워진 뒤 남은 n-그램들의 점수 상한 합이 `limit`번째 점수보다 작아지면 새 후보를
+받지 않고 기존 후보만 갱신합니다(MaxScore).
+
+명령줄 도구는 저장소를 읽기 전용으로 열므로 `sgmemory` 서버가 실행 중일
+때도 쓸 수 있습니다. 이때 색인은 저장하지 않으며, 서버가 마지막으로 저장한
+뒤 바뀐 내용이 있으면 메모리에서 다시 만듭니다.
+
+사용법::
+
+    python -m sgtools.memory.recall "JWT 인증 미들웨어" [--budget 2000] [--json]
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from ..tokens import get_tokenizer
+from .checkpoint import CHECKPOINT_PREFIX
+from .store import MemoryStore, MemoryStoreError, default_store_path
+
+RECALL_FILE_NAME = "recall.json"
+RECALL_VERSION = 1
+NGRAM = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+RECALL_CANDIDATES = 50
+# 이 비율보다 많은 문서에 나오는 n-그램은 질의에 더 드문 n-그램이 있으면 건너뜁니다.
+RECALL_MAX_DF = 0.5
+
+_RUN_RE = re.compile(r"\w+")
+
+
+def ngrams(text: str, n: int = NGRAM) -> List[str]:
+    """소문자로 정규화한 단어 문자열마다 문자 n-그램을 만듭니다. n보다 짧은 어절은 그대로 씁니다."""
+    grams: List[str] = []
+    for match in _RUN_RE.finditer(unicodedata.normalize("NFC", text).lower()):
+        run = match.group()
+        if len(run) <= n:
+            grams.append(run)
+        else:
+            grams.extend(run[i:i + n] for i in range(len(run) - n + 1))
+    return grams
+
+
+def _indexed(key: str) -> bool:
+    return not key.startswith(CHECKPOINT_PREFIX)
+
+
+@dataclass
+class Hit:
+    """회상 결과 하나."""
+
+    key: str
+    score: float
+    tokens: int
+    content: str
+
+
+class RecallIndex:
+    """`MemoryStore`에 연결된 증분 BM25 역색인.
+
+    첫 질의 전까지는 색인을 읽지 않고 바뀐 키만(값은 제외) 기록해 두므로,
+    회상을 쓰지 않는 세션의 시작 비용과 메모리 사용량에는 영향을 주지 않습니다.
+    """
+
+    def __init__(self, store: MemoryStore, n: int = NGRAM):
+        self.store = store
+        self.n = n
+        self._docs: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total = 0
+        self._loaded = False
+        self._changed: Set[str] = set()
+        store.flush()
+        self._opened = store.revision
+        store.observe(self._on_change)
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.store.path, RECALL_FILE_NAME)
+
+    # -- 유지 ----------------------------------------------------------
+
+    def _on_change(self, key: str, value: Optional[str]) -> None:
+        if not _indexed(key):
+            return
+        if self._loaded:
+            self._set(key, value)
+        else:
+            self._changed.add(key)
+
+    def _set(self, key: str, value: Optional[str]) -> None:
+        self._remove(key)
+        if value is None:
+            return
+        terms = dict(Counter(ngrams(key.replace("_", " "), self.n) + ngrams(value, self.n)))
+        self._add(key, terms)
+
+    def _add(self, key: str, terms: Dict[str, int]) -> None:
+        self._docs[key] = terms
+        length = sum(terms.values())
+        self._lengths[key] = length
+        self._total += length
+        for gram, tf in terms.items():
+            self._postings.setdefault(gram, {})[key] = tf
+
+    def _remove(self, key: str) -> None:
+        terms = self._docs.pop(key, None)
+        if terms is None:
+            return
+        self._total -= self._lengths.pop(key)
+        for gram in terms:
+            posting = self._postings[gram]
+            del posting[key]
+            if not posting:
+                del self._postings[gram]
+
+    def _ensure(self) -> None:
+        if self._loaded:
+            return
+        if not self._load_snapshot():
+            self.rebuild()
+        self._loaded = True
+        for key in self._changed:
+            self._set(key, self.store.get(key))
+        self._changed.clear()
+
+    def _load_snapshot(self) -> bool:
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != RECALL_VERSION or data.get("ngram") != self.n:
+            return False
+        # 연결 이후의 변경은 `_changed`에 있으므로, 연결 시점의 저장소와 비교합니다.
+        if data.get("revision") != self._opened:
+            return False
+        for key, terms in data["docs"].items():
+            self._add(key, terms)
+        return True
+
+    def rebuild(self) -> None:
+        """저장소 전체에서 색인을 다시 만듭니다."""
+        self._docs.clear()
+        self._lengths.clear()
+        self._postings.clear()
+        self._total = 0
+        for key, value in self.store.items():
+            if _indexed(key):
+                self._set(key, value)
+        self._changed.clear()
+        self._loaded = True
+
+    def save(self) -> None:
+        """색인을 저장소 옆에 기록합니다. 저장소의 보류 중인 변경도 함께 기록합니다.
+
+        색인을 읽은 적이 없으면 아무것도 하지 않습니다. 그동안 바뀐 메모리가
+        있으면 스냅샷의 `revision`이 맞지 않게 되어 다음 질의에서 다시 만듭니다.
+        """
+        if self.store.read_only or not self._loaded:
+            return
+        self.store.flush()
+        data = {
+            "version": RECALL_VERSION,
+            "ngram": self.n,
+            "revision": self.store.revision,
+            "docs": self._docs,
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    # -- 질의 ----------------------------------------------------------
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[tuple]:
+        """`(키, 점수)`를 점수 내림차순으로 반환합니다.
+
+        `limit`이 있으면 상위 `limit`개에 들 수 없는 문서는 끝까지 점수를 매기지
+        않지만, 반환하는 순위와 점수는 전체를 매긴 결과와 같습니다.
+        """
+        self._ensure()
+        count = len(self._docs)
+        if not count:
+            return []
+        avg = self._total / count
+        terms = []
+        for gram, qtf in Counter(ngrams(query, self.n)).items():
+            posting = self._postings.get(gram)
+            if posting:
+                idf = math.log(1.0 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                terms.append((posting, qtf * idf))
+        terms.sort(key=lambda term: len(term[0]))
+        common = count * RECALL_MAX_DF
+        if terms and len(terms[0][0]) <= common:
+            terms = [term for term in terms if len(term[0]) <= common]
+        # n-그램 하나가 문서 점수에 더할 수 있는 최댓값은 weight * (k1 + 1)입니다.
+        rest = sum(weight for _, weight in terms) * (BM25_K1 + 1.0)
+        scores: Dict[str, float] = {}
+        for posting, weight in terms:
+            items = posting.items()
+            if limit is not None and len(scores) >= limit:
+                floor = heapq.nlargest(limit, scores.values())[-1]
+                if rest < floor:
+                    # 아직 점수가 없는 문서는 상위에 들 수 없으므로 기존 후보만 갱신합니다.
+                    scores = {key: score for key, score in scores.items() if score + rest >= floor}
+                    items = [(key, posting[key]) for key in scores if key in posting]
+            for key, tf in items:
+                norm = tf + BM25_K1 * (1.0 - BM25_B + BM25_B * self._lengths[key] / avg)
+                scores[key] = scores.get(key, 0.0) + weight * tf * (BM25_K1 + 1.0) / norm
+            rest -= weight * (BM25_K1 + 1.0)
+        if limit is not None:
+            return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def recall(self, query: str, token_budget: int, tokenizer: str = "heuristic",
+               limit: Optional[int] = RECALL_CANDIDATES) -> List[Hit]:
+        """점수 순으로 예산(`render_hit()` 결과의 토큰 수)에 들어가는 메모리만 고릅니다.
+
+        순위가 높은 메모리가 예산을 넘으면 건너뛰고 다음 메모리를 시도합니다. 값은
+        상위 `limit`개 후보만 읽으므로 메모리 개수가 늘어도 읽는 양은 일정합니다.
+        """
+        count = get_tokenizer(tokenizer)
+        hits: List[Hit] = []
+        remaining = token_budget
+        for key, score in self.search(query, limit):
+            content = self.store.get(key)
+            if content is None:
+                continue
+            tokens = count(render_hit(key, content))
+            if tokens > remaining:
+                continue
+            hits.append(Hit(key, round(score, 4), tokens, content))
+            remaining -= tokens
+            if remaining <= 0:
+                break
+        return hits
+
+    def stats(self) -> dict:
+        self._ensure()
+        return {"documents": len(self._docs), "grams": len(self._postings), "total_grams": self._total}
+
+
+def render_hit(key: str, content: str) -> str:
+    return f"## {key}\n{content.rstrip()}\n\n"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="sgtools.memory.recall", description=__doc__.splitlines()[0])
+    parser.add_argument("query", help="회상 질의")
+    parser.add_argument("--budget", type=int, default=2000, help="반환할 메모리의 최대 토큰 수")
+    parser.add_argument("--limit", type=int, default=RECALL_CANDIDATES, help="검토할 최대 후보 수")
+    parser.add_argument("--tokenizer", default="heuristic", help="토큰 측정에 쓸 토크나이저")
+    parser.add_argument("--store", help="저장소 디렉토리 (기본값: .gemini/.memory)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="색인을 처음부터 다시 만들어 저장합니다 (쓰기 잠금이 필요하므로 서버가 꺼져 있어야 합니다)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력합니다")
+    args = parser.parse_args(argv)
+    try:
+        store = MemoryStore(args.store or default_store_path(), read_only=not args.rebuild)
+    except MemoryStoreError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    with store:
+        index = RecallIndex(store)
+        if args.rebuild:
+            index.rebuild()
+        try:
+            hits = index.recall(args.query, args.budget, args.tokenizer, args.limit)
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        index.save()
+    if args.json:
+        print(json.dumps([hit.__dict__ for hit in hits], ensure_ascii=False, indent=2))
+    else:
+        for hit in hits:
+            sys.stdout.write(render_hit(hit.key, hit.content))
+        used = sum(hit.tokens for hit in hits)
+        print(f"{len(hits)} memories, {used}/{args.budget} tokens", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
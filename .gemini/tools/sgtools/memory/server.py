@@ -0,0 +1,333 @@
+"""Serena 호환 메모리 도구를 제공하는 로컬 MCP 서버 (stdio).
+
+`/sg:save`와 `/sg:load`가 사용하는 `write_memory`, `read_memory`,
+`list_memories`, `delete_memory`를 `MemoryStore` 위에서 제공합니다.
+`delete_memory`와 `list_memories`는 `checkpoint_*`, `task_2.*` 같은 글롭을
+받으며, 인덱스 구간 조회로 처리됩니다. 변경 도구는 응답 전에 한 번의
+fsync로 기록되므로, 글롭 삭제처럼 여러 키를 바꾸는 호출도 한 번만 동기화합니다.
+
+`checkpoint_*` 메모리는 `CheckpointStore`의 청크 저장소를 거칩니다.
+`save_checkpoint`/`load_checkpoint`는 `/sg:save --checkpoint`와
+`/sg:load --type checkpoint`에 대응합니다.
+
+`recall_memories`는 `RecallIndex`의 BM25 순위로 질의와 관련된 메모리만 토큰
+예산 안에서 돌려주며, `/sg:load --query ... --budget N`에 대응합니다.
+
+Gemini CLI `settings.json` 등록 예::
+
+    "mcpServers": {
+      "sgmemory": {
+        "command": "python",
+        "args": ["-m", "sgtools.memory.server"],
+        "cwd": ".gemini/tools"
+      }
+    }
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from .checkpoint import (
+    CHECKPOINT_PREFIX,
+    LATEST_ALIAS,
+    CheckpointStore,
+    is_manifest,
+    parse_snapshot,
+    snapshot_memories,
+)
+from .recall import RECALL_CANDIDATES, RecallIndex, render_hit
+from .store import MemoryStore, MemoryStoreError, default_store_path
+
+PROTOCOL_VERSION = "2024-11-05"
+SERVER_NAME = "sgmemory"
+SERVER_VERSION = "0.1.0"
+
+_JSON_TYPES = {"string": str, "integer": int, "boolean": bool, "object": dict, "array": list}
+
+
+class ToolError(Exception):
+    """도구 호출 오류. 결과에 `isError: true`로 보고됩니다."""
+
+
+@dataclass
+class Tool:
+    name: str
+    description: str
+    properties: dict
+    required: List[str]
+    handler: Callable[["MemoryServer", dict], str]
+    mutates: bool = False
+
+    def schema(self) -> dict:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "inputSchema": {"type": "object", "properties": self.properties, "required": self.required},
+        }
+
+    def validate(self, args) -> dict:
+        """인자를 스키마의 필수 항목과 JSON 형식에 맞춰 검사합니다."""
+        if args is None:
+            args = {}
+        if not isinstance(args, dict):
+            raise ToolError("arguments는 객체여야 합니다")
+        for name in self.required:
+            if name not in args:
+                raise ToolError(f"{name}이(가) 필요합니다")
+        for name, value in args.items():
+            expected = self.properties.get(name, {}).get("type")
+            if expected is None or value is None:
+                continue
+            types = _JSON_TYPES[expected]
+            if not isinstance(value, types) or (expected == "integer" and isinstance(value, bool)):
+                raise ToolError(f"{name}은(는) {expected} 형식이어야 합니다")
+        return args
+
+
+TOOLS: Dict[str, Tool] = {}
+
+
+def tool(name: str, description: str, properties: dict, required=(), mutates: bool = False):
+    """MCP 도구를 등록하는 데코레이터."""
+
+    def decorator(func):
+        TOOLS[name] = Tool(name, description, properties, list(required), func, mutates)
+        return func
+
+    return decorator
+
+
+def memory_name(args: dict) -> str:
+    """Serena와 같이 `memory_file_name`/`memory_name`을 받고 `.md` 접미사를 무시합니다."""
+    name = args.get("memory_file_name") or args.get("memory_name")
+    if not name:
+        raise ToolError("memory_file_name이 필요합니다")
+    return name[:-3] if name.endswith(".md") else name
+
+
+_NAME_PROPS = {
+    "memory_file_name": {"type": "string", "description": "메모리 이름"},
+    "memory_name": {"type": "string", "description": "memory_file_name의 별칭"},
+}
+
+
+@tool(
+    "write_memory",
+    "메모리를 쓰거나 덮어씁니다.",
+    {**_NAME_PROPS, "content": {"type": "string"}},
+    required=["content"],
+    mutates=True,
+)
+def write_memory(server: "MemoryServer", args: dict) -> str:
+    name = memory_name(args)
+    if name.startswith(CHECKPOINT_PREFIX):
+        server.checkpoints.create(args["content"], key=name)
+    else:
+        server.store.put(name, args["content"])
+    return f"Memory {name} written."
+
+
+@tool("read_memory", "메모리 내용을 읽습니다.", dict(_NAME_PROPS))
+def read_memory(server: "MemoryServer", args: dict) -> str:
+    name = memory_name(args)
+    value = server.store.get(name)
+    if value is None:
+        raise ToolError(f"Memory {name} not found.")
+    if is_manifest(value):
+        return server.checkpoints.restore(name)
+    return value
+
+
+@tool(
+    "list_memories",
+    "메모리 이름 목록을 반환합니다. pattern으로 글롭(`task_2.*`)을 지정할 수 있습니다.",
+    {"pattern": {"type": "string"}},
+)
+def list_memories(server: "MemoryServer", args: dict) -> str:
+    return json.dumps(server.store.keys(args.get("pattern")), ensure_ascii=False)
+
+
+@tool(
+    "delete_memory",
+    "메모리를 삭제합니다. 이름에 글롭(`checkpoint_*`)을 쓰면 일치하는 모든 메모리를 삭제합니다.",
+    dict(_NAME_PROPS),
+    mutates=True,
+)
+def delete_memory(server: "MemoryServer", args: dict) -> str:
+    name = memory_name(args)
+    removed = server.store.delete_matching(name)
+    if not removed:
+        raise ToolError(f"Memory {name} not found.")
+    if any(key.startswith(CHECKPOINT_PREFIX) for key in removed):
+        server.store.flush()
+        server.checkpoints.gc()
+    return f"Deleted {len(removed)} memories: " + ", ".join(removed)
+
+
+@tool(
+    "save_checkpoint",
+    "체크포인트를 만듭니다. content가 없으면 체크포인트를 제외한 모든 메모리를 스냅샷합니다. "
+    "이전 체크포인트와 같은 청크는 다시 저장하지 않습니다.",
+    {"checkpoint_id": {"type": "string"}, "content": {"type": "string"}},
+    mutates=True,
+)
+def save_checkpoint(server: "MemoryServer", args: dict) -> str:
+    key = args.get("checkpoint_id")
+    if key and not key.startswith(CHECKPOINT_PREFIX):
+        key = CHECKPOINT_PREFIX + key
+    content = args.get("content")
+    if content is None:
+        content = snapshot_memories(server.store)
+    info = server.checkpoints.create(content, key=key)
+    return json.dumps(info.__dict__, ensure_ascii=False)
+
+
+@tool(
+    "load_checkpoint",
+    "체크포인트를 복원합니다(기본값: 최신). restore가 true이고 메모리 스냅샷이면 "
+    "스냅샷의 메모리를 다시 씁니다. 스냅샷에 없는 메모리는 지우지 않습니다.",
+    {"checkpoint_id": {"type": "string"}, "restore": {"type": "boolean"}},
+    mutates=True,
+)
+def load_checkpoint(server: "MemoryServer", args: dict) -> str:
+    key = args.get("checkpoint_id")
+    if key and not key.startswith(CHECKPOINT_PREFIX):
+        key = CHECKPOINT_PREFIX + key
+    if not key or key == LATEST_ALIAS:
+        key = server.checkpoints.latest()
+    if not key:
+        raise ToolError("No checkpoints.")
+    content = server.checkpoints.restore(key)
+    if not args.get("restore"):
+        return content
+    memories = parse_snapshot(content)
+    if memories is None:
+        raise ToolError(f"{key} is not a memory snapshot; use read_memory to view it.")
+    with server.store.batch():
+        for name, value in memories.items():
+            server.store.put(name, value)
+    return f"Restored {len(memories)} memories from {key}."
+
+
+@tool(
+    "recall_memories",
+    "질의와 관련된 메모리를 BM25 순위로 골라 token_budget 토큰 안에 들어가는 만큼 반환합니다.",
+    {
+        "query": {"type": "string"},
+        "token_budget": {"type": "integer", "description": "반환할 메모리의 최대 토큰 수 (기본값: 2000)"},
+        "limit": {"type": "integer", "description": f"검토할 최대 후보 수 (기본값: {RECALL_CANDIDATES})"},
+    },
+    required=["query"],
+)
+def recall_memories(server: "MemoryServer", args: dict) -> str:
+    query = args["query"].strip()
+    if not query:
+        raise ToolError("query가 비어 있습니다")
+    budget = args.get("token_budget")
+    limit = args.get("limit")
+    hits = server.recall.recall(query, 2000 if budget is None else budget,
+                                limit=RECALL_CANDIDATES if limit is None else limit)
+    if not hits:
+        return "No matching memories."
+    return "".join(render_hit(hit.key, hit.content) for hit in hits).rstrip() + "\n"
+
+
+class MemoryServer:
+    """JSON-RPC 2.0 메시지를 처리하는 MCP 서버."""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+        self.checkpoints = CheckpointStore(store)
+        self.recall = RecallIndex(store)
+
+    def call_tool(self, name: str, args: dict) -> dict:
+        entry = TOOLS.get(name)
+        if entry is None:
+            return {"content": [{"type": "text", "text": f"Unknown tool: {name}"}], "isError": True}
+        try:
+            text = entry.handler(self, entry.validate(args))
+            if entry.mutates:
+                self.store.flush()
+        except (ToolError, MemoryStoreError, KeyError, ValueError) as exc:
+            return {"content": [{"type": "text", "text": str(exc)}], "isError": True}
+        return {"content": [{"type": "text", "text": text}], "isError": False}
+
+    def handle(self, message) -> Optional[dict]:
+        """요청 하나를 처리합니다. 알림(id 없음)이면 None을 반환합니다."""
+        if not isinstance(message, dict):
+            return _error(None, -32600, "Invalid Request")
+        method = message.get("method")
+        params = message.get("params") or {}
+        if "id" not in message:
+            return None
+        if not isinstance(params, dict):
+            return _error(message["id"], -32602, "Invalid params")
+        if method == "initialize":
+            result = {
+                "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": SERVER_NAME, "version": SERVER_VERSION},
+            }
+        elif method == "ping":
+            result = {}
+        elif method == "tools/list":
+            result = {"tools": [t.schema() for t in TOOLS.values()]}
+        elif method == "tools/call":
+            result = self.call_tool(params.get("name"), params.get("arguments"))
+        else:
+            return _error(message["id"], -32601, f"Method not found: {method}")
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+    def serve(self, stdin=None, stdout=None) -> None:
+        """줄 단위 JSON-RPC를 표준 입출력으로 처리합니다."""
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                response = _error(None, -32700, "Parse error")
+            else:
+                response = self.handle(message)
+            if response is not None:
+                text = json.dumps(response, ensure_ascii=False)
+                try:
+                    text.encode("utf-8")
+                except UnicodeEncodeError:
+                    # 요청에 있던 짝 없는 서로게이트가 응답에 섞이면 \u 이스케이프로 보냅니다.
+                    text = json.dumps(response)
+                stdout.write(text + "\n")
+                stdout.flush()
+
+
+def _error(msg_id, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": msg_id, "error": {"code": code, "message": message}}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="sgtools.memory.server", description=__doc__.splitlines()[0])
+    parser.add_argument("--store", help="저장소 디렉토리 (기본값: .gemini/.memory)")
+    parser.add_argument("--batch-size", type=int, default=256, help="자동 기록 전 최대 보류 변경 수")
+    args = parser.parse_args(argv)
+    try:
+        store = MemoryStore(args.store or default_store_path(), batch_size=args.batch_size)
+    except MemoryStoreError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    with store:
+        server = MemoryServer(store)
+        try:
+            server.serve()
+        finally:
+            server.recall.save()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
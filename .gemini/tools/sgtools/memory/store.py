@@ -0,0 +1,498 @@
+"""인덱스를 갖춘 로그 구조 메모리 저장소.
+
+`MODE_Task_Management_ko.md`의 키 스키마(`plan_*`, `phase_N`, `task_N.M`,
+`todo_*`, `checkpoint_*`)처럼 접두사로 묶이는 키를 빠르게 다루도록
+설계되었습니다.
+
+디스크 구성 (`<경로>/`):
+
+- `data.log`: 추가 전용 레코드 로그. 각 레코드는 CRC32를 포함하며, 충돌로
+  잘린 꼬리 레코드는 다음 열기에서 잘라냅니다.
+- `index.json`: 닫을 때 기록하는 인덱스 스냅샷. 열 때 스냅샷을 읽고 그 이후의
+  로그만 재생하므로 전체 로그를 다시 읽지 않습니다.
+- `lock`: 단일 쓰기 프로세스를 보장하는 잠금 파일. `read_only=True`로 열면
+  잠그지 않으므로 서버가 실행 중일 때도 다른 도구가 기록된 내용을 읽을 수
+  있습니다(마지막 fsync 시점까지).
+
+키는 정렬된 목록으로 유지되어 접두사/글롭 조회(`checkpoint_*`, `task_2.*`)가
+전체 스캔 대신 이진 탐색 구간만 검사합니다. 쓰기는 메모리에 모았다가
+`flush()`에서 한 번의 쓰기와 fsync로 기록합니다.
+"""
+
+import bisect
+import contextlib
+import fnmatch
+import json
+import os
+import struct
+import uuid
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+LOG_MAGIC = b"SGMEM1\0\0"
+LOG_HEADER_SIZE = len(LOG_MAGIC) + 16
+RECORD = struct.Struct("<IBHI")  # crc32, op, key length, value length
+OP_PUT = 1
+OP_DELETE = 2
+SNAPSHOT_VERSION = 1
+MEMORY_DIR_NAME = ".memory"
+
+GLOB_CHARS = "*?["
+
+
+class MemoryStoreError(Exception):
+    """메모리 저장소 오류."""
+
+
+def default_store_path(start: Optional[str] = None) -> str:
+    """가장 가까운 `.gemini/` 아래의 `.memory/` 경로를 반환합니다."""
+    from ..context import ContextError, find_root
+
+    try:
+        gemini_dir = os.path.dirname(find_root(start))
+    except ContextError:
+        gemini_dir = os.path.join(os.path.abspath(start or os.getcwd()), ".gemini")
+    return os.path.join(gemini_dir, MEMORY_DIR_NAME)
+
+
+def split_pattern(pattern: str) -> Tuple[str, bool]:
+    """글롭 패턴을 `(리터럴 접두사, 글롭 여부)`로 나눕니다."""
+    for i, ch in enumerate(pattern):
+        if ch in GLOB_CHARS:
+            return pattern[:i], True
+    return pattern, False
+
+
+def _check_text(kind: str, text) -> bytes:
+    """키나 값이 UTF-8로 기록 가능한 문자열인지 확인하고 인코딩합니다."""
+    if not isinstance(text, str):
+        raise MemoryStoreError(f"메모리 {kind}: 문자열이 필요합니다 ({type(text).__name__})")
+    try:
+        return text.encode("utf-8")
+    except UnicodeEncodeError as exc:
+        raise MemoryStoreError(f"메모리 {kind}: UTF-8로 인코딩할 수 없습니다 ({exc.reason})") from None
+
+
+def _encode(op: int, key: bytes, value: bytes) -> bytes:
+    body = struct.pack("<BHI", op, len(key), len(value)) + key + value
+    return struct.pack("<I", zlib.crc32(body)) + body
+
+
+def _fsync_dir(path: str) -> None:
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class MemoryStore:
+    """키-값 메모리 저장소.
+
+    `batch_size`개의 변경이 쌓이면 자동으로 기록합니다. 응답 전에 내구성이
+    필요하면 `flush()`를, 여러 변경을 한 번의 fsync로 묶으려면 `batch()`를
+    사용합니다. `read_only=True`이면 잠금 없이 읽기만 하며 변경은 오류입니다.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, read_only: bool = False):
+        self.path = path
+        self.batch_size = batch_size
+        self.read_only = read_only
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._overlay: Dict[str, Optional[str]] = {}
+        self._keys: List[str] = []
+        self._dead_bytes = 0
+        self._batch_depth = 0
+        self._lock_fh = None
+        self._reader = None
+        self._writer = None
+        self._generation = b""
+        self._end = 0
+        self._observers: List[Callable[[str, Optional[str]], None]] = []
+        self._open()
+
+    # -- 열기/닫기 -----------------------------------------------------
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(self.path, "data.log")
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.path, "index.json")
+
+    def _open(self) -> None:
+        if self.read_only:
+            self._open_read_only()
+            return
+        os.makedirs(self.path, exist_ok=True)
+        self._lock_fh = open(os.path.join(self.path, "lock"), "a+b")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_fh.close()
+                raise MemoryStoreError(f"다른 프로세스가 저장소를 사용 중입니다: {self.path}") from None
+        if not os.path.exists(self.log_path):
+            self._create_log(self.log_path)
+            _fsync_dir(self.path)
+        self._reader = open(self.log_path, "rb")
+        header = self._reader.read(LOG_HEADER_SIZE)
+        if len(header) != LOG_HEADER_SIZE or not header.startswith(LOG_MAGIC):
+            raise MemoryStoreError(f"메모리 로그 형식이 올바르지 않습니다: {self.log_path}")
+        self._generation = header[len(LOG_MAGIC):]
+        start = self._load_snapshot()
+        end = self._replay(start)
+        size = os.path.getsize(self.log_path)
+        if end < size:
+            # 잘라낸 구간을 가리키는 스냅샷이 나중에 로그가 다시 자랐을 때 채택되지 않도록 지웁니다.
+            self._discard_snapshot()
+            with open(self.log_path, "r+b") as fh:
+                fh.truncate(end)
+                os.fsync(fh.fileno())
+        self._keys = sorted(self._index)
+        self._writer = open(self.log_path, "ab")
+
+    def _open_read_only(self) -> None:
+        try:
+            self._reader = open(self.log_path, "rb")
+        except FileNotFoundError:
+            raise MemoryStoreError(f"메모리 저장소가 없습니다: {self.path}") from None
+        header = self._reader.read(LOG_HEADER_SIZE)
+        if len(header) != LOG_HEADER_SIZE or not header.startswith(LOG_MAGIC):
+            self._reader.close()
+            raise MemoryStoreError(f"메모리 로그 형식이 올바르지 않습니다: {self.log_path}")
+        self._generation = header[len(LOG_MAGIC):]
+        # 쓰는 중인 꼬리 레코드는 CRC 검사에서 멈추므로 잘라내지 않고 무시합니다.
+        self._end = self._replay(self._load_snapshot())
+        self._keys = sorted(self._index)
+
+    def _create_log(self, path: str) -> bytes:
+        generation = uuid.uuid4().bytes
+        with open(path, "wb") as fh:
+            fh.write(LOG_MAGIC + generation)
+            fh.flush()
+            os.fsync(fh.fileno())
+        return generation
+
+    def _load_snapshot(self) -> int:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return LOG_HEADER_SIZE
+        except (OSError, ValueError):
+            self._discard_snapshot()
+            return LOG_HEADER_SIZE
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != SNAPSHOT_VERSION
+            or data.get("generation") != self._generation.hex()
+            or data.get("log_size", 0) > os.path.getsize(self.log_path)
+        ):
+            self._discard_snapshot()
+            return LOG_HEADER_SIZE
+        self._index = {key: (loc[0], loc[1]) for key, loc in data["index"].items()}
+        self._dead_bytes = data.get("dead_bytes", 0)
+        return data["log_size"]
+
+    def _discard_snapshot(self) -> None:
+        """거부한 스냅샷을 지웁니다. 남겨 두면 로그가 다시 그 크기를 넘었을 때 잘못 채택됩니다."""
+        if self.read_only:
+            return
+        try:
+            os.remove(self.snapshot_path)
+        except FileNotFoundError:
+            return
+        _fsync_dir(self.path)
+
+    def _replay(self, start: int) -> int:
+        """`start`부터 로그를 재생하고 마지막 정상 레코드의 끝 위치를 반환합니다."""
+        fh = self._reader
+        fh.seek(start)
+        pos = start
+        while True:
+            header = fh.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            crc, op, klen, vlen = RECORD.unpack(header)
+            body = fh.read(klen + vlen)
+            if len(body) < klen + vlen or zlib.crc32(header[4:] + body) != crc:
+                break
+            key = body[:klen].decode("utf-8")
+            self._retire(key)
+            size = RECORD.size + klen + vlen
+            if op == OP_PUT:
+                self._index[key] = (pos + RECORD.size + klen, vlen)
+            else:
+                self._index.pop(key, None)
+                self._dead_bytes += size
+            pos += size
+        return pos
+
+    def _retire(self, key: str) -> None:
+        old = self._index.get(key)
+        if old is not None:
+            self._dead_bytes += RECORD.size + len(key.encode("utf-8")) + old[1]
+
+    def _write_snapshot(self) -> None:
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "generation": self._generation.hex(),
+            "log_size": self._writer.tell(),
+            "dead_bytes": self._dead_bytes,
+            "index": self._index,
+        }
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False, separators=(",", ":"))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.snapshot_path)
+
+    def close(self) -> None:
+        """보류 중인 쓰기를 기록하고 스냅샷을 남긴 뒤 닫습니다."""
+        if self.read_only and self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._writer is None:
+            return
+        self.flush()
+        self._write_snapshot()
+        self._writer.close()
+        self._reader.close()
+        self._writer = self._reader = None
+        if self._lock_fh is not None:
+            self._lock_fh.close()
+            self._lock_fh = None
+
+    @property
+    def revision(self) -> str:
+        """기록된 로그의 위치(`세대:크기`). 같으면 디스크 내용도 같습니다."""
+        end = self._writer.tell() if self._writer is not None else self._end
+        return f"{self._generation.hex()}:{end}"
+
+    def __enter__(self) -> "MemoryStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- 조회 ----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._overlay:
+            return self._overlay[key] is not None
+        return key in self._index
+
+    def get(self, key: str) -> Optional[str]:
+        """키의 값을 반환합니다. 없으면 None."""
+        if key in self._overlay:
+            return self._overlay[key]
+        loc = self._index.get(key)
+        if loc is None:
+            return None
+        self._reader.seek(loc[0])
+        return self._reader.read(loc[1]).decode("utf-8")
+
+    def size_of(self, key: str) -> Optional[int]:
+        """값의 바이트 크기를 값을 읽지 않고 반환합니다."""
+        if key in self._overlay:
+            value = self._overlay[key]
+            return None if value is None else len(value.encode("utf-8"))
+        loc = self._index.get(key)
+        return None if loc is None else loc[1]
+
+    def keys(self, pattern: Optional[str] = None) -> List[str]:
+        """정렬된 키 목록. `pattern`은 글롭(`task_2.*`) 또는 정확한 키입니다."""
+        if not pattern:
+            return list(self._keys)
+        prefix, is_glob = split_pattern(pattern)
+        if not is_glob:
+            return [pattern] if pattern in self else []
+        return [key for key in self._range(prefix) if fnmatch.fnmatchcase(key, pattern)]
+
+    def keys_with_prefix(self, prefix: str) -> List[str]:
+        return list(self._range(prefix))
+
+    def _range(self, prefix: str) -> Iterator[str]:
+        keys = self._keys
+        i = bisect.bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield keys[i]
+            i += 1
+
+    def items(self, pattern: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+        for key in self.keys(pattern):
+            yield key, self.get(key)
+
+    # -- 변경 ----------------------------------------------------------
+
+    def put(self, key: str, value: str) -> None:
+        """키에 값을 씁니다. `flush()` 전까지는 메모리에만 있습니다.
+
+        기록할 수 없는 키나 값은 보류 목록에 넣기 전에 거부하므로, 잘못된 쓰기
+        하나가 이후의 `flush()`를 모두 실패하게 만들지 않습니다.
+        """
+        self._check_writable()
+        raw_key = _check_text("키", key)
+        if not raw_key or len(raw_key) > 0xFFFF:
+            raise MemoryStoreError(f"잘못된 메모리 키: {key!r}")
+        if len(_check_text("값", value)) > 0xFFFFFFFF:
+            raise MemoryStoreError(f"메모리 값이 너무 큽니다: {key}")
+        if key not in self:
+            bisect.insort(self._keys, key)
+        self._overlay[key] = value
+        self._notify(key, value)
+        self._maybe_flush()
+
+    def delete(self, key: str) -> bool:
+        """키를 삭제합니다. 키가 있었으면 True."""
+        self._check_writable()
+        if key not in self:
+            return False
+        i = bisect.bisect_left(self._keys, key)
+        del self._keys[i]
+        self._overlay[key] = None
+        self._notify(key, None)
+        self._maybe_flush()
+        return True
+
+    def delete_matching(self, pattern: str) -> List[str]:
+        """패턴과 일치하는 모든 키를 삭제하고 삭제한 키 목록을 반환합니다."""
+        removed = self.keys(pattern)
+        with self.batch():
+            for key in removed:
+                self.delete(key)
+        return removed
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise MemoryStoreError(f"읽기 전용으로 연 저장소입니다: {self.path}")
+
+    def observe(self, callback: Callable[[str, Optional[str]], None]) -> None:
+        """변경마다 `callback(key, value)`를 호출하도록 등록합니다. 삭제는 value가 None입니다."""
+        self._observers.append(callback)
+
+    def _notify(self, key: str, value: Optional[str]) -> None:
+        for callback in self._observers:
+            callback(key, value)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """블록 안의 변경을 블록이 끝날 때 한 번에 기록합니다."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+
+    def _maybe_flush(self) -> None:
+        if self._batch_depth == 0 and len(self._overlay) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """보류 중인 변경을 한 번의 쓰기와 fsync로 로그에 기록합니다.
+
+        쓰기가 실패하면 로그를 쓰기 전 크기로 되돌리고 보류 중인 변경은 남겨 두어
+        다음 `flush()`에서 다시 시도합니다.
+        """
+        if not self._overlay:
+            return
+        base = self._writer.tell()
+        chunks: List[bytes] = []
+        updates: List[Tuple[str, Optional[Tuple[int, int]]]] = []
+        deleted_bytes = 0
+        pos = base
+        for key, value in self._overlay.items():
+            raw_key = key.encode("utf-8")
+            if value is None:
+                if key not in self._index:
+                    continue
+                record = _encode(OP_DELETE, raw_key, b"")
+                updates.append((key, None))
+                deleted_bytes += len(record)
+            else:
+                raw_value = value.encode("utf-8")
+                record = _encode(OP_PUT, raw_key, raw_value)
+                updates.append((key, (pos + RECORD.size + len(raw_key), len(raw_value))))
+            chunks.append(record)
+            pos += len(record)
+        if chunks:
+            try:
+                self._writer.write(b"".join(chunks))
+                self._writer.flush()
+                os.fsync(self._writer.fileno())
+            except OSError as exc:
+                self._rollback(base)
+                raise MemoryStoreError(f"메모리 로그에 쓸 수 없습니다: {exc}") from exc
+        self._dead_bytes += deleted_bytes
+        for key, loc in updates:
+            self._retire(key)
+            if loc is None:
+                self._index.pop(key, None)
+            else:
+                self._index[key] = loc
+        self._overlay.clear()
+        if self._dead_bytes > (1 << 20) and self._dead_bytes * 2 > pos:
+            self.compact()
+
+    def _rollback(self, size: int) -> None:
+        """실패한 쓰기의 일부가 남지 않도록 로그를 `size`로 되돌립니다."""
+        try:
+            self._writer.close()
+        except OSError:
+            pass
+        with open(self.log_path, "r+b") as fh:
+            fh.truncate(size)
+            os.fsync(fh.fileno())
+        self._writer = open(self.log_path, "ab")
+
+    def compact(self) -> None:
+        """살아 있는 레코드만 새 로그로 다시 쓰고 원자적으로 교체합니다."""
+        self._check_writable()
+        self.flush()
+        tmp = self.log_path + ".compact"
+        generation = self._create_log(tmp)
+        index: Dict[str, Tuple[int, int]] = {}
+        with open(tmp, "ab") as out:
+            pos = LOG_HEADER_SIZE
+            for key in self._keys:
+                raw_key = key.encode("utf-8")
+                raw_value = self.get(key).encode("utf-8")
+                record = _encode(OP_PUT, raw_key, raw_value)
+                out.write(record)
+                index[key] = (pos + RECORD.size + len(raw_key), len(raw_value))
+                pos += len(record)
+            out.flush()
+            os.fsync(out.fileno())
+        self._writer.close()
+        self._reader.close()
+        os.replace(tmp, self.log_path)
+        _fsync_dir(self.path)
+        self._generation = generation
+        self._index = index
+        self._dead_bytes = 0
+        self._reader = open(self.log_path, "rb")
+        self._writer = open(self.log_path, "ab")
+        self._write_snapshot()
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._keys),
+            "pending": len(self._overlay),
+            "log_bytes": self._writer.tell() if self._writer else 0,
+            "dead_bytes": self._dead_bytes,
+        }
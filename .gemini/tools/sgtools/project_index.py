@@ -0,0 +1,504 @@
+"""`/sg:load --type project|deps --refresh`를 위한 영구 증분 프로젝트 인덱스.
+
+파일 메타데이터(크기, mtime), 내용 해시, 기호/개요 요약, 종속성 매니페스트에서
+추출한 종속성 그래프를 `.gemini/.cache/project-index.sqlite`에 저장합니다.
+
+- `--refresh`는 크기/mtime이 바뀐 파일만 다시 해시하고, 해시까지 바뀐 파일만
+  개요를 다시 추출합니다. 큰 파일은 메모리 매핑으로 읽습니다.
+- git 저장소에서는 `git status`와 마지막으로 인덱싱한 커밋 이후의 `git diff`로
+  후보 파일을 좁히므로, 10만 개 이상의 파일이 있어도 전체 트리를 걷지 않습니다.
+  git을 쓸 수 없거나 `--full`을 주면 전체 트리를 stat 합니다.
+- 새로고침 없이 실행하면 인덱스에 저장된 요약만 읽습니다.
+
+사용법::
+
+    python -m sgtools.project_index [경로] [--type project|deps] [--refresh] [--full] [--json]
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+from . import CACHE_DIR_NAME, GEMINI_DIR_NAME
+from .delegate import IGNORED_DIRS
+
+INDEX_FILE_NAME = "project-index.sqlite"
+SCHEMA_VERSION = 1
+MMAP_THRESHOLD = 1 << 20
+OUTLINE_MAX_BYTES = 1 << 20
+OUTLINE_MAX_ITEMS = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    lang TEXT,
+    outline TEXT
+);
+CREATE TABLE IF NOT EXISTS deps (
+    manifest TEXT NOT NULL,
+    package TEXT,
+    name TEXT NOT NULL,
+    spec TEXT,
+    kind TEXT
+);
+CREATE INDEX IF NOT EXISTS deps_manifest ON deps (manifest);
+"""
+
+LANGUAGES = {
+    ".py": "python", ".js": "javascript", ".mjs": "javascript", ".cjs": "javascript", ".jsx": "javascript",
+    ".ts": "typescript", ".tsx": "typescript", ".go": "go", ".rs": "rust", ".java": "java", ".kt": "kotlin",
+    ".rb": "ruby", ".c": "c", ".h": "c", ".cc": "cpp", ".cpp": "cpp", ".hpp": "cpp", ".cs": "csharp",
+    ".md": "markdown", ".toml": "toml", ".json": "json", ".yaml": "yaml", ".yml": "yaml", ".sh": "shell",
+}
+
+_OUTLINE_PATTERNS = {
+    "python": re.compile(rb"^[ \t]*(?:async[ \t]+)?(def|class)[ \t]+([A-Za-z_]\w*)", re.M),
+    "javascript": re.compile(
+        rb"^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?(?:async[ \t]+)?(function\*?|class)[ \t]+([A-Za-z_$][\w$]*)"
+        rb"|^[ \t]*export[ \t]+(const|let|var)[ \t]+([A-Za-z_$][\w$]*)", re.M),
+    "go": re.compile(rb"^(func|type)[ \t]+(?:\([^)]*\)[ \t]*)?([A-Za-z_]\w*)", re.M),
+    "rust": re.compile(rb"^[ \t]*(?:pub(?:\([^)]*\))?[ \t]+)?(fn|struct|enum|trait|mod|impl)[ \t]+([A-Za-z_]\w*)", re.M),
+    "java": re.compile(rb"^[ \t]*(?:(?:public|private|protected|abstract|final|static)[ \t]+)*"
+                       rb"(class|interface|enum|record)[ \t]+([A-Za-z_]\w*)", re.M),
+    "markdown": re.compile(rb"^(#{1,3})[ \t]+(.+?)[ \t]*$", re.M),
+}
+_OUTLINE_PATTERNS["typescript"] = _OUTLINE_PATTERNS["javascript"]
+_OUTLINE_PATTERNS["kotlin"] = _OUTLINE_PATTERNS["java"]
+
+MANIFEST_NAMES = ("package.json", "pyproject.toml", "Cargo.toml", "go.mod")
+_REQUIREMENTS_RE = re.compile(r"^requirements[\w.-]*\.txt$")
+_REQ_LINE_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)(\[[^\]]*\])?\s*(.*?)\s*(?:#.*)?$")
+
+
+# 인덱스 자신과 메모리 저장소는 색인하지 않습니다.
+_SKIPPED_PREFIXES = (f"{GEMINI_DIR_NAME}/{CACHE_DIR_NAME}/", f"{GEMINI_DIR_NAME}/.memory/")
+
+
+def _skipped(path: str) -> bool:
+    return path.startswith(_SKIPPED_PREFIXES)
+
+
+def is_manifest(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return name in MANIFEST_NAMES or bool(_REQUIREMENTS_RE.match(name))
+
+
+def default_index_path(root: str) -> str:
+    return os.path.join(os.path.abspath(root), GEMINI_DIR_NAME, CACHE_DIR_NAME, INDEX_FILE_NAME)
+
+
+# -- 내용 분석 ---------------------------------------------------------
+
+
+def hash_file(path: str, size: int) -> Tuple[str, Optional[bytes]]:
+    """파일 해시와 (개요 추출용) 내용을 반환합니다. 큰 파일은 mmap으로 해시만 합니다."""
+    with open(path, "rb") as fh:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.sha256(mm).hexdigest(), None
+        data = fh.read()
+    return hashlib.sha256(data).hexdigest(), data
+
+
+def outline(lang: Optional[str], data: Optional[bytes]) -> List[str]:
+    """언어별 정규식으로 `종류 이름:줄` 형태의 개요를 추출합니다."""
+    pattern = _OUTLINE_PATTERNS.get(lang or "")
+    if pattern is None or data is None or len(data) > OUTLINE_MAX_BYTES:
+        return []
+    items = []
+    for match in pattern.finditer(data):
+        groups = [g for g in match.groups() if g]
+        kind, name = groups[0].decode("utf-8", "replace"), groups[1].decode("utf-8", "replace")
+        line = data.count(b"\n", 0, match.start()) + 1
+        items.append(f"{kind} {name}:{line}")
+        if len(items) >= OUTLINE_MAX_ITEMS:
+            break
+    return items
+
+
+def parse_manifest(path: str, data: bytes) -> Tuple[Optional[str], List[Tuple[str, str, str]]]:
+    """매니페스트에서 `(패키지 이름, [(종속성, 버전 조건, 종류)])`를 추출합니다."""
+    name = path.rsplit("/", 1)[-1]
+    text = data.decode("utf-8", "replace")
+    deps: List[Tuple[str, str, str]] = []
+    package = None
+    try:
+        if name == "package.json":
+            doc = json.loads(text)
+            package = doc.get("name")
+            for kind in ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies"):
+                for dep, spec in (doc.get(kind) or {}).items():
+                    deps.append((dep, str(spec), kind))
+        elif name == "go.mod":
+            in_block = False
+            for line in text.splitlines():
+                line = line.split("//")[0].strip()
+                if line.startswith("module "):
+                    package = line.split()[1]
+                elif line.startswith("require ("):
+                    in_block = True
+                elif in_block and line == ")":
+                    in_block = False
+                elif in_block or line.startswith("require "):
+                    parts = line.replace("require ", "", 1).split()
+                    if len(parts) >= 2:
+                        deps.append((parts[0], parts[1], "require"))
+        elif name.endswith(".toml") and tomllib is not None:
+            doc = tomllib.loads(text)
+            if name == "Cargo.toml":
+                package = (doc.get("package") or {}).get("name")
+                for kind in ("dependencies", "dev-dependencies", "build-dependencies"):
+                    for dep, spec in (doc.get(kind) or {}).items():
+                        deps.append((dep, spec if isinstance(spec, str) else json.dumps(spec), kind))
+            else:
+                project = doc.get("project") or {}
+                package = project.get("name")
+                for req in project.get("dependencies") or []:
+                    deps.append(_split_requirement(req) + ("dependencies",))
+                for extra, reqs in (project.get("optional-dependencies") or {}).items():
+                    for req in reqs:
+                        deps.append(_split_requirement(req) + (f"extra:{extra}",))
+                poetry = (doc.get("tool") or {}).get("poetry") or {}
+                package = package or poetry.get("name")
+                for dep, spec in (poetry.get("dependencies") or {}).items():
+                    if dep != "python":
+                        deps.append((dep, spec if isinstance(spec, str) else json.dumps(spec), "poetry"))
+        elif _REQUIREMENTS_RE.match(name):
+            for line in text.splitlines():
+                if line.strip() and not line.lstrip().startswith(("#", "-")):
+                    deps.append(_split_requirement(line) + ("requirements",))
+    except (ValueError, AttributeError, TypeError):
+        return package, deps
+    return package, [d for d in deps if d[0]]
+
+
+def _split_requirement(req: str) -> Tuple[str, str]:
+    match = _REQ_LINE_RE.match(req.split(";")[0])
+    if not match:
+        return "", ""
+    return match.group(1), match.group(3)
+
+
+# -- 파일 후보 수집 ----------------------------------------------------
+
+
+def walk(root: str) -> Dict[str, Tuple[int, int]]:
+    """전체 트리를 걸어 `{경로: (크기, mtime_ns)}`를 반환합니다."""
+    found: Dict[str, Tuple[int, int]] = {}
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, rel) if rel else root)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                path = f"{rel}/{entry.name}" if rel else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS:
+                        stack.append(path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    found[path] = (st.st_size, st.st_mtime_ns)
+    return found
+
+
+def _git(root: str, *args: str) -> Optional[str]:
+    try:
+        proc = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, check=False)
+    except OSError:
+        return None
+    return proc.stdout if proc.returncode == 0 else None
+
+
+def git_head(root: str) -> Optional[str]:
+    out = _git(root, "rev-parse", "HEAD")
+    return out.strip() if out else None
+
+
+def git_dirty(root: str) -> Optional[Set[str]]:
+    """작업 트리에서 더러운 경로를 `root` 기준 상대 경로로 반환합니다. 알 수 없으면 None.
+
+    `status --porcelain`은 항상 저장소 루트 기준 경로를 내므로, `root`가 하위
+    디렉토리이면 `rev-parse --show-prefix`의 접두사를 떼어 냅니다.
+    """
+    prefix = _git(root, "rev-parse", "--show-prefix")
+    status = _git(root, "status", "--porcelain", "-z", "--untracked-files=all", "--no-renames", "--", ".")
+    if prefix is None or status is None:
+        return None
+    prefix = prefix.strip()
+    paths = (entry[3:] for entry in status.split("\0") if len(entry) > 3)
+    return {path[len(prefix):] for path in paths if path.startswith(prefix)}
+
+
+def git_candidates(root: str, since: str) -> Optional[Tuple[Set[str], Set[str]]]:
+    """마지막 인덱싱 커밋 이후 바뀌었을 수 있는 경로와, 현재 작업 트리에서 더러운
+    경로를 `root` 기준으로 반환합니다. 알 수 없으면 None."""
+    diff = _git(root, "diff", "--relative", "--name-only", "-z", "--no-renames", since, "HEAD", "--")
+    dirty = git_dirty(root)
+    if diff is None or dirty is None:
+        return None
+    return {p for p in diff.split("\0") if p} | dirty, dirty
+
+
+# -- 인덱스 ------------------------------------------------------------
+
+
+@dataclass
+class RefreshStats:
+    scanned: int = 0
+    added: int = 0
+    changed: int = 0
+    touched: int = 0  # mtime만 바뀌고 내용은 같은 파일
+    removed: int = 0
+    manifests: int = 0
+    strategy: str = "full"
+    elapsed_ms: float = 0.0
+
+
+@dataclass
+class ProjectSummary:
+    files: int
+    bytes: int
+    languages: Dict[str, int]
+    top_dirs: Dict[str, int]
+    manifests: List[str] = field(default_factory=list)
+
+
+class ProjectIndex:
+    """SQLite에 저장되는 프로젝트 인덱스."""
+
+    def __init__(self, root: str, path: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.path = path or default_index_path(self.root)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        if self.meta("schema") not in (None, str(SCHEMA_VERSION)):
+            self.db.executescript("DELETE FROM files; DELETE FROM deps; DELETE FROM meta;")
+        self.set_meta("schema", str(SCHEMA_VERSION))
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "ProjectIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def is_empty(self) -> bool:
+        return self.meta("refreshed_at") is None
+
+    def refresh(self, full: bool = False) -> RefreshStats:
+        """바뀐 파일만 다시 인덱싱합니다."""
+        started = time.perf_counter()
+        stats = RefreshStats()
+        known: Dict[str, Tuple[int, int, str]] = {
+            path: (size, mtime, sha) for path, size, mtime, sha in
+            self.db.execute("SELECT path, size, mtime_ns, sha256 FROM files")
+        }
+
+        head = git_head(self.root)
+        candidates = None
+        dirty: Set[str] = set()
+        if not full and head and not self.is_empty and self.meta("strategy") == "git":
+            found = git_candidates(self.root, self.meta("git_head") or head)
+            if found is not None:
+                # 지난번에 더러웠다가 되돌려진 파일도 다시 확인합니다.
+                candidates, dirty = found
+                candidates |= set(json.loads(self.meta("git_dirty") or "[]"))
+
+        if candidates is None:
+            if head and not full:
+                listed = _git(self.root, "ls-files", "-z", "--cached", "--others", "--exclude-standard")
+                paths = [p for p in (listed or "").split("\0") if p and not _skipped(p)]
+                dirty = git_dirty(self.root) or set()
+                current = {}
+                for path in paths:
+                    try:
+                        st = os.stat(os.path.join(self.root, path))
+                    except OSError:
+                        continue
+                    current[path] = (st.st_size, st.st_mtime_ns)
+                stats.strategy = "git"
+            else:
+                current = {p: v for p, v in walk(self.root).items() if not _skipped(p)}
+                stats.strategy = "full"
+            removed = [p for p in known if p not in current]
+        else:
+            stats.strategy = "git-incremental"
+            current, removed = {}, []
+            for path in candidates:
+                if _skipped(path):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.root, path))
+                except OSError:
+                    if path in known:
+                        removed.append(path)
+                    continue
+                current[path] = (st.st_size, st.st_mtime_ns)
+
+        stats.scanned = len(current)
+        upserts, touches, manifests = [], [], []
+        for path, (size, mtime) in current.items():
+            old = known.get(path)
+            if old is not None and old[0] == size and old[1] == mtime:
+                continue
+            try:
+                sha, data = hash_file(os.path.join(self.root, path), size)
+            except OSError:
+                continue
+            if old is not None and old[2] == sha:
+                touches.append((size, mtime, path))
+                stats.touched += 1
+                continue
+            lang = LANGUAGES.get(os.path.splitext(path)[1].lower())
+            upserts.append((path, size, mtime, sha, lang, json.dumps(outline(lang, data), ensure_ascii=False)))
+            if old is None:
+                stats.added += 1
+            else:
+                stats.changed += 1
+            if is_manifest(path):
+                manifests.append((path, data))
+
+        with self.db:
+            self.db.executemany("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?", touches)
+            self.db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", upserts)
+            self.db.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in removed])
+            for path in removed:
+                if is_manifest(path):
+                    self.db.execute("DELETE FROM deps WHERE manifest = ?", (path,))
+            for path, data in manifests:
+                if data is None:
+                    with open(os.path.join(self.root, path), "rb") as fh:
+                        data = fh.read()
+                package, deps = parse_manifest(path, data)
+                self.db.execute("DELETE FROM deps WHERE manifest = ?", (path,))
+                self.db.executemany(
+                    "INSERT INTO deps VALUES (?, ?, ?, ?, ?)",
+                    [(path, package, name, spec, kind) for name, spec, kind in deps] or [(path, package, "", "", "")],
+                )
+            stats.removed = len(removed)
+            stats.manifests = len(manifests)
+            self.set_meta("strategy", "git" if stats.strategy.startswith("git") else "full")
+            if head:
+                self.set_meta("git_head", head)
+                self.set_meta("git_dirty", json.dumps(sorted(p for p in dirty if not _skipped(p))))
+            self.set_meta("refreshed_at", str(time.time()))
+        stats.elapsed_ms = (time.perf_counter() - started) * 1000.0
+        return stats
+
+    def summary(self) -> ProjectSummary:
+        files, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files").fetchone()
+        languages = dict(self.db.execute(
+            "SELECT lang, COUNT(*) FROM files WHERE lang IS NOT NULL GROUP BY lang ORDER BY 2 DESC"))
+        top: Counter = Counter()
+        for (path,) in self.db.execute("SELECT path FROM files"):
+            top[path.split("/", 1)[0] if "/" in path else "."] += 1
+        manifests = [row[0] for row in self.db.execute("SELECT DISTINCT manifest FROM deps ORDER BY manifest")]
+        return ProjectSummary(files, size, languages, dict(top.most_common(20)), manifests)
+
+    def dependency_graph(self) -> Dict[str, dict]:
+        """매니페스트별 종속성과, 저장소 안의 다른 패키지를 가리키는 내부 간선."""
+        rows = self.db.execute("SELECT manifest, package, name, spec, kind FROM deps ORDER BY manifest, kind, name")
+        graph: Dict[str, dict] = {}
+        for manifest, package, name, spec, kind in rows:
+            entry = graph.setdefault(manifest, {"package": package, "deps": [], "internal": []})
+            if name:
+                entry["deps"].append({"name": name, "spec": spec, "kind": kind})
+        local = {entry["package"]: manifest for manifest, entry in graph.items() if entry["package"]}
+        for manifest, entry in graph.items():
+            entry["internal"] = sorted({local[d["name"]] for d in entry["deps"]
+                                        if d["name"] in local and local[d["name"]] != manifest})
+        return graph
+
+    def outline_of(self, path: str) -> List[str]:
+        row = self.db.execute("SELECT outline FROM files WHERE path = ?", (path,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else []
+
+
+def _render_project(summary: ProjectSummary, stats: Optional[RefreshStats]) -> str:
+    lines = [f"files: {summary.files} ({summary.bytes} B)"]
+    if summary.languages:
+        lines.append("languages: " + ", ".join(f"{k} {v}" for k, v in summary.languages.items()))
+    lines.append("top-level: " + ", ".join(f"{k} {v}" for k, v in summary.top_dirs.items()))
+    if summary.manifests:
+        lines.append("manifests: " + ", ".join(summary.manifests))
+    if stats is not None:
+        lines.append(
+            f"refresh[{stats.strategy}]: scanned {stats.scanned}, added {stats.added}, changed {stats.changed}, "
+            f"touched {stats.touched}, removed {stats.removed} in {stats.elapsed_ms:.1f}ms"
+        )
+    return "\n".join(lines)
+
+
+def _render_deps(graph: Dict[str, dict]) -> str:
+    lines = []
+    for manifest, entry in graph.items():
+        lines.append(f"{manifest} ({entry['package'] or '-'}): {len(entry['deps'])} deps")
+        for target in entry["internal"]:
+            lines.append(f"  -> {target}")
+        for dep in entry["deps"]:
+            lines.append(f"  {dep['kind']}: {dep['name']} {dep['spec']}".rstrip())
+    return "\n".join(lines) or "no dependency manifests"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="sgtools.project_index", description=__doc__.splitlines()[0])
+    parser.add_argument("root", nargs="?", default=".", help="프로젝트 루트")
+    parser.add_argument("--type", choices=("project", "deps"), default="project")
+    parser.add_argument("--refresh", action="store_true", help="바뀐 파일을 다시 인덱싱합니다")
+    parser.add_argument("--full", action="store_true", help="git 후보 대신 전체 트리를 stat 합니다")
+    parser.add_argument("--index", help="인덱스 파일 경로 (기본값: <루트>/.gemini/.cache/project-index.sqlite)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with ProjectIndex(args.root, args.index) as index:
+        stats = index.refresh(full=args.full) if args.refresh or index.is_empty else None
+        if args.type == "deps":
+            graph = index.dependency_graph()
+            print(json.dumps(graph, ensure_ascii=False, indent=2) if args.json else _render_deps(graph))
+        else:
+            summary = index.summary()
+            if args.json:
+                data = {"summary": summary.__dict__, "refresh": stats.__dict__ if stats else None}
+                print(json.dumps(data, ensure_ascii=False, indent=2))
+            else:
+                print(_render_project(summary, stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
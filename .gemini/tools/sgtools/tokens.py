@@ -0,0 +1,326 @@
+"""프레임워크 컨텍스트의 구성 요소별 토큰 비용 프로파일러.
+
+`GEMINI.md`를 `sgtools.context`와 같은 방식으로 조립한 뒤, 가져온 파일별,
+섹션 제목별 토큰 수를 보고합니다. 토크나이저는 오프라인으로 동작하는
+구현을 이름으로 골라 쓸 수 있으며(`--tokenizer`), `tiktoken`이 설치되어 있으면
+`tiktoken:<encoding>` 형태로도 사용할 수 있습니다.
+
+`--save-baseline`은 현재 측정값을 기준선 파일에 저장하고, `--check`는 항상
+로드되는 컨텍스트가 설정된 예산을 넘으면 0이 아닌 종료 코드로 실패합니다.
+`--lazy-modes`를 주면 MODE 문서는 `sgtools.triggers`가 필요할 때만 주입하는
+것으로 보고 항상 로드되는 부분에서 제외합니다. `--lazy-modes`/`--no-lazy-modes`를
+주지 않으면 기준선의 `lazy_modes` 설정을 따르므로, 지연 로드 기준선에서도
+`--no-lazy-modes`로 전체 프로파일을 보거나 기준선을 다시 만들 수 있습니다.
+
+사용법::
+
+    python -m sgtools.tokens [--tokenizer heuristic] [--sections]
+    python -m sgtools.tokens --save-baseline [--budget N] [--lazy-modes | --no-lazy-modes]
+    python -m sgtools.tokens --check
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .context import FENCE_RE, Bundle, ContextError, assemble, compile_context, find_root
+
+BASELINE_FILE_NAME = "token-budget.json"
+
+Tokenizer = Callable[[str], int]
+TOKENIZERS: Dict[str, Tokenizer] = {}
+
+HEADING_RE = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*$")
+_WORD_RE = re.compile(r"[A-Za-z]+|[0-9]+|\s+|.", re.DOTALL)
+
+
+def register_tokenizer(name: str) -> Callable[[Tokenizer], Tokenizer]:
+    """토크나이저 함수를 `name`으로 등록하는 데코레이터."""
+
+    def decorator(func: Tokenizer) -> Tokenizer:
+        TOKENIZERS[name] = func
+        return func
+
+    return decorator
+
+
+@register_tokenizer("heuristic")
+def heuristic_tokens(text: str) -> int:
+    """BPE 계열 토크나이저를 근사합니다.
+
+    영문 단어는 4글자당 1토큰, 숫자는 3자리당 1토큰, 한글 음절과 기타
+    비ASCII 문자는 글자당 1토큰, 문장 부호는 1토큰, 공백은 무시합니다.
+    """
+    count = 0
+    for match in _WORD_RE.finditer(text):
+        piece = match.group()
+        ch = piece[0]
+        if ch.isspace():
+            continue
+        if ch.isascii() and ch.isalpha():
+            count += math.ceil(len(piece) / 4)
+        elif ch.isdigit() and ch.isascii():
+            count += math.ceil(len(piece) / 3)
+        elif unicodedata.category(ch) in ("Mn", "Me", "Cf"):
+            continue
+        else:
+            count += 1
+    return count
+
+
+@register_tokenizer("chars")
+def char_tokens(text: str) -> int:
+    """4글자당 1토큰으로 계산하는 가장 단순한 근사치."""
+    return math.ceil(len(text) / 4)
+
+
+@register_tokenizer("bytes")
+def byte_tokens(text: str) -> int:
+    """UTF-8 바이트 4개당 1토큰. 한글(3바이트/음절)의 비용을 반영합니다."""
+    return math.ceil(len(text.encode("utf-8")) / 4)
+
+
+@register_tokenizer("whitespace")
+def whitespace_tokens(text: str) -> int:
+    """공백으로 구분한 단어 수."""
+    return len(text.split())
+
+
+def get_tokenizer(name: str) -> Tokenizer:
+    """이름으로 토크나이저를 찾습니다. `tiktoken:<encoding>`도 지원합니다."""
+    if name in TOKENIZERS:
+        return TOKENIZERS[name]
+    if name.startswith("tiktoken:"):
+        try:
+            import tiktoken
+        except ImportError:
+            raise ValueError("tiktoken이 설치되어 있지 않습니다") from None
+        encoding = tiktoken.get_encoding(name.split(":", 1)[1])
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    raise ValueError(f"알 수 없는 토크나이저: {name} (사용 가능: {', '.join(sorted(TOKENIZERS))})")
+
+
+def split_sections(text: str) -> List[tuple]:
+    """문서를 `(제목, 본문)` 목록으로 나눕니다. 첫 제목 앞 내용의 제목은 ''입니다."""
+    sections: List[tuple] = []
+    title = ""
+    buf: List[str] = []
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_RE.match(line)
+        if match:
+            if buf:
+                sections.append((title, "".join(buf)))
+            title = match.group(1) + " " + match.group(2)
+            buf = [line]
+        else:
+            buf.append(line)
+    if buf:
+        sections.append((title, "".join(buf)))
+    return sections
+
+
+@dataclass
+class FileProfile:
+    """가져온 파일 하나의 토큰 수(하위 가져오기 제외)."""
+
+    name: str
+    bytes: int
+    tokens: int
+    sections: List[tuple] = field(default_factory=list)
+
+
+@dataclass
+class Profile:
+    """조립된 컨텍스트 전체의 프로파일."""
+
+    tokenizer: str
+    total: int
+    files: List[FileProfile]
+
+
+def own_text(bundle: Bundle, name: str) -> str:
+    """가져오기를 제외한 파일 자체의 텍스트."""
+    return "".join(value for kind, value in bundle.files[name].parts if kind == "text")
+
+
+def profile_bundle(bundle: Bundle, tokenizer: str = "heuristic", text: Optional[str] = None,
+                   names: Optional[List[str]] = None) -> Profile:
+    """번들을 프로파일링합니다.
+
+    `text`를 주면 전체 합계를 그 텍스트로 계산하고, `names`를 주면 그 파일만
+    보고합니다. 지연 로드 모드처럼 번들 일부만 항상 로드되는 경우에 씁니다.
+    """
+    count = get_tokenizer(tokenizer)
+    files = []
+    for name in names if names is not None else bundle.order:
+        body = own_text(bundle, name)
+        sections = [(title, count(chunk)) for title, chunk in split_sections(body)]
+        files.append(FileProfile(name, len(body.encode("utf-8")), count(body), sections))
+    total = count(bundle.text if text is None else text)
+    return Profile(tokenizer, total, files)
+
+
+def default_baseline_path(root: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(root)), BASELINE_FILE_NAME)
+
+
+def load_baseline(path: str) -> Optional[dict]:
+    """기준선을 읽습니다. 파일이 없으면 None, 형식이 잘못되었으면 ValueError를 발생시킵니다."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except FileNotFoundError:
+        return None
+    except ValueError as exc:
+        raise ValueError(f"기준선 파일을 읽을 수 없습니다: {path}: {exc}") from None
+    if not isinstance(data, dict):
+        raise ValueError(f"기준선 파일 형식이 잘못되었습니다: {path}")
+    return data
+
+
+def save_baseline(path: str, profile: Profile, budget: Optional[int], lazy_modes: bool = False) -> dict:
+    data = {
+        "tokenizer": profile.tokenizer,
+        "budget": budget,
+        "lazy_modes": lazy_modes,
+        "total": profile.total,
+        "files": {f.name: f.tokens for f in profile.files},
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, ensure_ascii=False, indent=2)
+        fh.write("\n")
+    return data
+
+
+def check_budget(profile: Profile, baseline: dict) -> List[str]:
+    """예산 초과 항목을 설명하는 메시지 목록을 반환합니다(비어 있으면 통과)."""
+    failures = []
+    budget = baseline.get("budget")
+    if budget is not None and profile.total > budget:
+        failures.append(f"항상 로드되는 컨텍스트 {profile.total} 토큰이 예산 {budget}을 초과합니다")
+    return failures
+
+
+def _format_delta(current: int, previous: Optional[int]) -> str:
+    if previous is None:
+        return "new"
+    delta = current - previous
+    return f"{delta:+d}" if delta else "="
+
+
+def render(profile: Profile, baseline: Optional[dict], show_sections: bool) -> str:
+    previous = baseline.get("files", {}) if baseline else {}
+    lines = [f"tokenizer: {profile.tokenizer}"]
+    width = max([len(f.name) for f in profile.files] + [5])
+    for f in sorted(profile.files, key=lambda f: -f.tokens):
+        share = f.tokens / profile.total * 100 if profile.total else 0.0
+        delta = _format_delta(f.tokens, previous.get(f.name)) if baseline else ""
+        lines.append(f"{f.name:<{width}} {f.tokens:>7} {share:5.1f}% {f.bytes:>7} B  {delta}")
+        if show_sections:
+            for title, tokens in sorted(f.sections, key=lambda s: -s[1]):
+                lines.append(f"  {tokens:>7}  {title or '(preamble)'}")
+    delta = _format_delta(profile.total, baseline.get("total")) if baseline else ""
+    lines.append(f"{'total':<{width}} {profile.total:>7}  {delta}")
+    if baseline and baseline.get("budget") is not None:
+        lines.append(f"budget: {baseline['budget']} ({profile.total / baseline['budget'] * 100:.1f}% used)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="sgtools.tokens", description=__doc__.splitlines()[0])
+    parser.add_argument("--root", help="루트 문서 (기본값: 가장 가까운 .gemini/GEMINI.md)")
+    parser.add_argument("--tokenizer", help="토크나이저 이름 (기본값: 기준선의 토크나이저 또는 heuristic)")
+    parser.add_argument("--baseline", help="기준선 파일 (기본값: .gemini/token-budget.json)")
+    parser.add_argument("--sections", action="store_true", help="섹션 제목별 토큰 수를 함께 출력합니다")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력합니다")
+    parser.add_argument("--save-baseline", action="store_true", help="현재 측정값을 기준선으로 저장합니다")
+    parser.add_argument("--budget", type=int, help="--save-baseline과 함께 예산(토큰)을 설정합니다")
+    parser.add_argument("--check", action="store_true", help="예산 초과 시 실패합니다")
+    parser.add_argument("--lazy-modes", action="store_true",
+                        help="MODE 문서를 항상 로드되는 부분에서 제외합니다 (기본값: 기준선 설정)")
+    parser.add_argument("--no-lazy-modes", dest="lazy_modes", action="store_false",
+                        help="기준선 설정과 관계없이 MODE 문서를 포함합니다")
+    parser.set_defaults(lazy_modes=None)
+    args = parser.parse_args(argv)
+
+    try:
+        root = args.root or find_root()
+        bundle = compile_context(root)
+    except ContextError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    baseline_path = args.baseline or default_baseline_path(root)
+    try:
+        baseline = load_baseline(baseline_path)
+    except (OSError, ValueError) as exc:
+        if not args.save_baseline:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        print(f"warning: {exc}; 새 기준선으로 덮어씁니다", file=sys.stderr)
+        baseline = None
+    tokenizer = args.tokenizer or (baseline or {}).get("tokenizer", "heuristic")
+    lazy_modes = args.lazy_modes if args.lazy_modes is not None else bool((baseline or {}).get("lazy_modes"))
+    text = names = None
+    if lazy_modes:
+        from .triggers import mode_files
+
+        modes = set(mode_files(bundle.order))
+        text = assemble(bundle.files, bundle.root, exclude=modes)
+        names = [name for name in bundle.order if name not in modes]
+    try:
+        profile = profile_bundle(bundle, tokenizer, text, names)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.save_baseline:
+        budget = args.budget if args.budget is not None else (baseline or {}).get("budget")
+        baseline = save_baseline(baseline_path, profile, budget, lazy_modes)
+        print(f"baseline saved: {baseline_path}")
+    elif baseline and baseline.get("tokenizer") != tokenizer:
+        if args.check:
+            print(f"error: 기준선은 '{baseline.get('tokenizer')}' 토크나이저로 측정되었습니다", file=sys.stderr)
+            return 1
+        baseline = None
+    elif baseline and bool(baseline.get("lazy_modes")) != lazy_modes:
+        # 항상 로드되는 파일 집합이 달라 합계와 파일별 증감을 비교할 수 없습니다.
+        if args.check:
+            print(f"error: 기준선은 lazy_modes={str(bool(baseline.get('lazy_modes'))).lower()}로 측정되었습니다 "
+                  f"(--save-baseline --{'' if lazy_modes else 'no-'}lazy-modes로 갱신)", file=sys.stderr)
+            return 1
+        print("warning: 기준선과 lazy_modes 설정이 달라 증감을 표시하지 않습니다", file=sys.stderr)
+        baseline = None
+
+    if args.json:
+        print(json.dumps({
+            "tokenizer": profile.tokenizer,
+            "total": profile.total,
+            "files": [{"name": f.name, "bytes": f.bytes, "tokens": f.tokens,
+                       "sections": [{"title": t, "tokens": n} for t, n in f.sections]}
+                      for f in profile.files],
+        }, ensure_ascii=False, indent=2))
+    else:
+        print(render(profile, baseline, args.sections))
+
+    if args.check:
+        if baseline is None:
+            print(f"error: 기준선이 없습니다: {baseline_path} (--save-baseline으로 생성)", file=sys.stderr)
+            return 1
+        failures = check_budget(profile, baseline)
+        for message in failures:
+            print(f"FAIL: {message}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
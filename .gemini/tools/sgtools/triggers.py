@@ -0,0 +1,351 @@
+"""플래그/모드 트리거 엔진과 활성 모드 지연 로드.
+
+`FLAGS_ko.md`와 각 `MODE_*_ko.md`의 활성화 트리거를 하나의 다중 패턴
+키워드 오토마톤(Aho-Corasick)과 임계값 평가기로 컴파일합니다. 요청 텍스트와
+수치 신호(컨텍스트/리소스 사용량, 위험 점수, 복잡도, 단계/디렉토리/파일 수)를
+받아 플래그를 결정하고, `FLAGS_ko.md`의 우선순위 규칙을 결정적으로 적용한 뒤,
+주입해야 하는 최소한의 MODE 문서 목록을 반환합니다.
+
+우선순위 규칙:
+
+- 안전 우선: `--safe-mode > --validate > 최적화 플래그`. `--safe-mode`가 켜지면
+  `--validate`는 포함된 것으로 보고 생략하며, 자동 감지된 최적화 플래그는
+  제외합니다. `--safe-mode`는 `--uc`를 자동 활성화합니다.
+- 명시적 재정의: 사용자가 쓴 플래그는 자동 감지 결과보다 우선합니다.
+- MCP 제어: `--no-mcp`는 모든 개별 MCP 플래그를 제거합니다.
+- 범위 우선순위: `--scope`가 여러 번 주어지면 system > project > module > file.
+
+사용법::
+
+    python -m sgtools.triggers "인증 흐름을 다듬기" --steps 4
+    python -m sgtools.triggers "..." --context-usage 0.8 --emit > context.md
+"""
+
+import argparse
+import json
+import operator
+import re
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .context import ContextError, assemble, compile_context, find_root
+
+# 모드 플래그 → MODE 문서
+MODE_FILES = {
+    "--brainstorm": "MODE_Brainstorming_ko.md",
+    "--introspect": "MODE_Introspection_ko.md",
+    "--task-manage": "MODE_Task_Management_ko.md",
+    "--orchestrate": "MODE_Task_Management_ko.md",
+    "--token-efficient": "MODE_Token_Efficiency_ko.md",
+    "--uc": "MODE_Token_Efficiency_ko.md",
+}
+
+ALIASES = {
+    "--bs": "--brainstorm",
+    "--introspection": "--introspect",
+    "--ultracompressed": "--uc",
+    "--context7": "--c7",
+    "--sequential": "--seq",
+    "--morphllm": "--morph",
+    "--playwright": "--play",
+}
+
+MCP_FLAGS = ("--c7", "--seq", "--magic", "--morph", "--serena", "--play", "--all-mcp")
+OPTIMIZATION_FLAGS = ("--delegate", "--concurrency", "--orchestrate", "--loop", "--iterations")
+VALUE_FLAGS = ("--delegate", "--concurrency", "--iterations", "--scope", "--focus")
+SCOPE_ORDER = ("file", "module", "project", "system")
+
+# 출력 순서: 안전 플래그가 먼저 오도록 고정합니다.
+FLAG_ORDER = (
+    "--safe-mode", "--validate",
+    "--brainstorm", "--introspect", "--task-manage", "--orchestrate", "--token-efficient", "--uc",
+    "--no-mcp", "--all-mcp", "--c7", "--seq", "--magic", "--morph", "--serena", "--play",
+    "--delegate", "--concurrency", "--loop", "--iterations", "--scope", "--focus",
+)
+
+# 키워드 → 플래그. 각 MODE 문서의 "활성화 트리거"와 FLAGS_ko.md의 트리거 항목에서 옮겼습니다.
+# 영문 키워드는 단어 단위로 일치하므로 활용형("debugging", "symbols")도 나열합니다.
+KEYWORD_TRIGGERS: Dict[str, Tuple[str, ...]] = {
+    "--brainstorm": (
+        "아마도", "어쩌면", "생각 중", "확실하지 않음", "확실하지 않", "할 수 있을까요",
+        "브레인스토밍", "탐색", "토론", "알아내기", "만들고 싶어요", "brainstorm", "brainstorming", "not sure", "maybe",
+    ),
+    "--introspect": (
+        "추론 분석", "내 추론", "성찰", "결정에 대해", "예상대로 작동하지", "예상치 못한",
+        "introspect", "introspection", "reflect on",
+    ),
+    "--task-manage": ("다듬기", "개선", "향상", "refine", "refined", "refining", "polish", "polished", "polishing"),
+    "--loop": (
+        "다듬기", "개선", "향상", "refine", "refined", "refining", "polish", "polished", "polishing",
+        "iterate", "iterated", "iterating",
+    ),
+    "--c7": ("라이브러리", "프레임워크", "공식 문서", "documentation"),
+    "--seq": ("디버깅", "시스템 설계", "debug", "debugging"),
+    "--magic": ("/ui", "/21", "디자인 시스템", "ui 구성 요소", "ui component", "ui components"),
+    "--morph": ("대량 코드 변환", "일괄 편집", "bulk edit", "bulk edits", "bulk editing"),
+    "--serena": ("프로젝트 메모리", "기호 작업", "symbol", "symbols"),
+    "--play": ("브라우저 테스트", "e2e", "접근성 테스트", "playwright"),
+}
+
+
+@dataclass(frozen=True)
+class Threshold:
+    """수치/불리언 신호 하나에 대한 트리거."""
+
+    signal: str
+    op: str
+    value: float
+    flag: str
+    flag_value: Optional[str] = None
+
+    _OPS = {">": operator.gt, ">=": operator.ge}
+
+    def matches(self, signals: "Signals") -> bool:
+        actual = getattr(signals, self.signal)
+        if actual is None:
+            return False
+        return self._OPS[self.op](actual, self.value)
+
+    def describe(self) -> str:
+        return f"{self.signal} {self.op} {self.value:g}"
+
+
+THRESHOLDS: Tuple[Threshold, ...] = (
+    Threshold("context_usage", ">", 0.75, "--token-efficient"),
+    Threshold("resource_usage", ">", 0.75, "--validate"),
+    Threshold("resource_usage", ">", 0.85, "--safe-mode"),
+    Threshold("risk_score", ">", 0.7, "--validate"),
+    Threshold("production", ">=", 1, "--validate"),
+    Threshold("production", ">=", 1, "--safe-mode"),
+    Threshold("critical", ">=", 1, "--safe-mode"),
+    Threshold("steps", ">=", 3, "--task-manage"),
+    Threshold("directories", ">=", 2, "--task-manage"),
+    Threshold("files", ">=", 3, "--task-manage"),
+    Threshold("directories", ">=", 7, "--delegate", "auto"),
+    Threshold("files", ">=", 50, "--delegate", "auto"),
+    Threshold("complexity", ">", 0.8, "--delegate", "auto"),
+)
+
+
+def _is_ascii_word(ch: str) -> bool:
+    return ch.isascii() and (ch.isalnum() or ch == "_")
+
+
+class KeywordAutomaton:
+    """Aho-Corasick 다중 패턴 매처. 대소문자를 구분하지 않습니다.
+
+    영문 키워드는 단어 경계에서만 일치합니다("symbolic"은 "symbol"이 아님).
+    한글 키워드는 조사가 붙어도 일치하도록 부분 문자열로 찾습니다.
+    """
+
+    def __init__(self, patterns: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, str]]] = [[]]
+        for tag, keywords in patterns.items():
+            for keyword in keywords:
+                self._add(keyword.lower(), tag)
+        self._build()
+
+    def _add(self, keyword: str, tag: str) -> None:
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((keyword, tag))
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0) if self._goto[fail].get(ch) != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> Iterator[Tuple[int, str, str]]:
+        """`(끝 위치, 키워드, 태그)`를 텍스트 순서대로 반환합니다."""
+        state = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        text = text.lower()
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword, tag in out[state]:
+                start = i + 1 - len(keyword)
+                if _is_ascii_word(keyword[0]) and start > 0 and _is_ascii_word(text[start - 1]):
+                    continue
+                if _is_ascii_word(keyword[-1]) and i + 1 < len(text) and _is_ascii_word(text[i + 1]):
+                    continue
+                yield i + 1, keyword, tag
+
+
+_AUTOMATON = KeywordAutomaton(KEYWORD_TRIGGERS)
+_FLAG_RE = re.compile(r"(?<!\S)(--[a-z][a-z0-9-]*)(?:[ =]([a-z0-9]+))?")
+
+
+@dataclass
+class Signals:
+    """트리거 평가 입력. 알 수 없는 수치는 None으로 둡니다."""
+
+    text: str = ""
+    context_usage: Optional[float] = None
+    resource_usage: Optional[float] = None
+    risk_score: Optional[float] = None
+    complexity: Optional[float] = None
+    steps: Optional[int] = None
+    directories: Optional[int] = None
+    files: Optional[int] = None
+    production: bool = False
+    critical: bool = False
+
+
+@dataclass
+class Activation:
+    """평가 결과: 활성 플래그(값 포함), 주입할 MODE 문서, 활성화 이유."""
+
+    flags: Dict[str, Optional[str]]
+    modes: List[str]
+    reasons: Dict[str, List[str]] = field(default_factory=dict)
+
+    def to_json(self) -> dict:
+        return {"flags": self.flags, "modes": self.modes, "reasons": self.reasons}
+
+
+def parse_flags(text: str) -> Dict[str, Optional[str]]:
+    """요청 텍스트에서 명시적 플래그를 추출하고 별칭을 정규화합니다.
+
+    `--scope`가 여러 번 나오면 가장 넓은 범위를 남깁니다.
+    """
+    flags: Dict[str, Optional[str]] = {}
+    for match in _FLAG_RE.finditer(text):
+        flag = ALIASES.get(match.group(1), match.group(1))
+        value = match.group(2) if flag in VALUE_FLAGS else None
+        if flag == "--scope" and flags.get("--scope") in SCOPE_ORDER and value in SCOPE_ORDER:
+            value = max(flags["--scope"], value, key=SCOPE_ORDER.index)
+        flags[flag] = value
+    return flags
+
+
+def _strip_flag(match: "re.Match") -> str:
+    """키워드 검색 전에 플래그를 지우되, 값을 받지 않는 플래그 뒤의 단어는 남깁니다."""
+    flag = ALIASES.get(match.group(1), match.group(1))
+    if flag in VALUE_FLAGS or not match.group(2):
+        return " "
+    return " " + match.group(2)
+
+
+def evaluate(signals: Signals) -> Activation:
+    """신호를 평가해 플래그와 MODE 문서 목록을 결정합니다."""
+    explicit = parse_flags(signals.text)
+    detected: Dict[str, Optional[str]] = {}
+    reasons: Dict[str, List[str]] = {}
+
+    def detect(flag: str, value: Optional[str], reason: str) -> None:
+        detected.setdefault(flag, value)
+        reasons.setdefault(flag, [])
+        if reason not in reasons[flag]:
+            reasons[flag].append(reason)
+
+    text = _FLAG_RE.sub(_strip_flag, signals.text)
+    for _end, keyword, flag in _AUTOMATON.search(text):
+        detect(flag, None, f"keyword '{keyword}'")
+    for rule in THRESHOLDS:
+        if rule.matches(signals):
+            detect(rule.flag, rule.flag_value, rule.describe())
+    for flag in explicit:
+        reasons.setdefault(flag, []).insert(0, "explicit")
+
+    # 명시적 재정의: 사용자 플래그 > 자동 감지
+    flags = dict(detected)
+    flags.update(explicit)
+
+    # 안전 우선: --safe-mode > --validate > 최적화 플래그
+    if "--safe-mode" in flags:
+        flags.pop("--validate", None)
+        for flag in OPTIMIZATION_FLAGS:
+            if flag in flags and flag not in explicit:
+                del flags[flag]
+        if "--uc" not in flags:
+            flags["--uc"] = None
+            reasons.setdefault("--uc", []).append("--safe-mode")
+
+    # MCP 제어: --no-mcp는 모든 개별 MCP 플래그를 재정의
+    if "--no-mcp" in flags:
+        for flag in MCP_FLAGS:
+            flags.pop(flag, None)
+
+    if "--concurrency" in flags and flags["--concurrency"] is not None:
+        n = int(flags["--concurrency"]) if flags["--concurrency"].isdigit() else 1
+        flags["--concurrency"] = str(min(max(n, 1), 15))
+
+    rank = {flag: i for i, flag in enumerate(FLAG_ORDER)}
+    ordered = dict(sorted(flags.items(), key=lambda kv: (rank.get(kv[0], len(rank)), kv[0])))
+    modes: List[str] = []
+    for flag in ordered:
+        mode = MODE_FILES.get(flag)
+        if mode and mode not in modes:
+            modes.append(mode)
+    return Activation(ordered, modes, {flag: reasons.get(flag, []) for flag in ordered})
+
+
+def mode_files(names: Iterable[str]) -> List[str]:
+    """번들 파일 중 MODE 문서를 반환합니다."""
+    return [name for name in names if re.match(r"(.*/)?MODE_[^/]*\.md$", name)]
+
+
+def assemble_for(bundle, activation: Activation) -> str:
+    """활성화된 MODE 문서만 포함해 컨텍스트를 조립합니다."""
+    active = set(activation.modes)
+    skipped = {name for name in mode_files(bundle.order) if name.rsplit("/", 1)[-1] not in active}
+    return assemble(bundle.files, bundle.root, exclude=skipped)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="sgtools.triggers", description=__doc__.splitlines()[0])
+    parser.add_argument("text", nargs="?", default="", help="요청 텍스트 (플래그 포함 가능, '-'는 표준 입력)")
+    parser.add_argument("--context-usage", type=float)
+    parser.add_argument("--resource-usage", type=float)
+    parser.add_argument("--risk-score", type=float)
+    parser.add_argument("--complexity", type=float)
+    parser.add_argument("--steps", type=int)
+    parser.add_argument("--directories", type=int)
+    parser.add_argument("--files", type=int)
+    parser.add_argument("--production", action="store_true")
+    parser.add_argument("--critical", action="store_true")
+    parser.add_argument("--root", help="루트 문서 (기본값: 가장 가까운 .gemini/GEMINI.md)")
+    parser.add_argument("--emit", action="store_true", help="활성 모드만 포함한 컨텍스트를 출력합니다")
+    args = parser.parse_args(argv)
+
+    text = sys.stdin.read() if args.text == "-" else args.text
+    signals = Signals(
+        text, args.context_usage, args.resource_usage, args.risk_score, args.complexity,
+        args.steps, args.directories, args.files, args.production, args.critical,
+    )
+    activation = evaluate(signals)
+    if not args.emit:
+        print(json.dumps(activation.to_json(), ensure_ascii=False, indent=2))
+        return 0
+    try:
+        bundle = compile_context(args.root or find_root())
+    except ContextError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    sys.stdout.write(assemble_for(bundle, activation))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""`sgtools` 단위 테스트. `.gemini/tools`에서 `python -m unittest discover tests`로 실행합니다."""
@@ -0,0 +1,97 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from sgtools.memory import checkpoint
+from sgtools.memory.checkpoint import CheckpointStore
+from sgtools.memory.store import MemoryStore
+
+
+def chunk_files(root: str) -> set:
+    return {name for _dir, _subdirs, files in os.walk(os.path.join(root, "chunks")) for name in files}
+
+
+class CheckpointStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = MemoryStore(os.path.join(self._tmp.name, "memory"))
+        self.checkpoints = CheckpointStore(self.store)
+        rnd = random.Random(7)
+        self.contents = {
+            name: "".join(rnd.choice("가나다라마바사 abcdef\n") for _ in range(20000))
+            for name in ("checkpoint_a1", "checkpoint_a2", "checkpoint_b")
+        }
+
+    def tearDown(self):
+        self.store.close()
+        self._tmp.cleanup()
+
+    def test_gc_after_glob_delete_keeps_other_checkpoints(self):
+        for key, content in self.contents.items():
+            self.checkpoints.create(content, key=key)
+        before = chunk_files(self.store.path)
+
+        self.assertEqual(self.store.delete_matching("checkpoint_a*"), ["checkpoint_a1", "checkpoint_a2"])
+        self.store.flush()
+        result = self.checkpoints.gc()
+
+        self.assertGreater(result["removed"], 0)
+        self.assertEqual(len(chunk_files(self.store.path)), len(before) - result["removed"])
+        self.assertEqual(self.checkpoints.keys(), ["checkpoint_b"])
+        self.assertEqual(self.checkpoints.restore("checkpoint_b"), self.contents["checkpoint_b"])
+
+    def test_unchanged_chunks_are_shared(self):
+        base = self.contents["checkpoint_a1"]
+        self.checkpoints.create(base, key="checkpoint_1")
+        info = self.checkpoints.create(base[:10000] + "변경" + base[10000:], key="checkpoint_2")
+        self.assertLess(info.new_bytes, len(base.encode("utf-8")) // 2)
+        self.assertEqual(self.checkpoints.restore("checkpoint_1"), base)
+
+    def test_latest_uses_pointer_without_scanning(self):
+        for key, content in self.contents.items():
+            self.checkpoints.create(content, key=key)
+
+        def no_scan():
+            raise AssertionError("keys() scanned every manifest")
+
+        self.checkpoints.keys = no_scan
+        self.assertEqual(self.checkpoints.latest(), "checkpoint_b")
+        self.assertEqual(self.store.keys(), sorted(self.contents))
+        info = self.checkpoints.create("next", key="checkpoint_c")
+        self.assertEqual(info.parent, "checkpoint_b")
+        del self.checkpoints.keys
+
+        self.checkpoints.delete("checkpoint_c")
+        self.assertEqual(self.checkpoints.latest(), "checkpoint_b")
+
+    def live_chunks(self) -> set:
+        return {digest[2:] for key in self.checkpoints.keys()
+                for digest, _size in self.checkpoints.manifest(key)["chunks"]}
+
+    def test_replacing_manifest_defers_collection(self):
+        self.checkpoints.create(self.contents["checkpoint_a1"], key="checkpoint_x")
+        self.checkpoints.create(self.contents["checkpoint_b"], key="checkpoint_y")
+        self.checkpoints.create(self.contents["checkpoint_a2"], key="checkpoint_x")
+        orphans = chunk_files(self.store.path) - self.live_chunks() - {"state.json"}
+        self.assertTrue(orphans)
+
+        result = self.checkpoints.gc()
+        self.assertEqual(result["removed"], len(orphans))
+        self.assertEqual(chunk_files(self.store.path) - {"state.json"}, self.live_chunks())
+        self.assertEqual(self.checkpoints.restore("checkpoint_y"), self.contents["checkpoint_b"])
+
+    def test_replacing_manifest_collects_once_garbage_accumulates(self):
+        self.checkpoints.create(self.contents["checkpoint_a1"], key="checkpoint_x")
+        self.checkpoints.create(self.contents["checkpoint_b"], key="checkpoint_y")
+        with mock.patch.object(checkpoint, "GC_MIN_GARBAGE", 0), \
+                mock.patch.object(checkpoint, "GC_GARBAGE_RATIO", 0.1), \
+                mock.patch.object(self.checkpoints, "gc", wraps=self.checkpoints.gc) as gc:
+            self.checkpoints.create(self.contents["checkpoint_a2"], key="checkpoint_x")
+        gc.assert_called_once_with()
+        self.assertEqual(chunk_files(self.store.path) - {"state.json"}, self.live_chunks())
+        self.assertEqual(self.checkpoints.restore("checkpoint_x"), self.contents["checkpoint_a2"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+
+from sgtools.compress import ESCAPE, build_table, compressor, expander, main, read_chunks, transform
+
+
+def pieces(text: str, rnd: random.Random):
+    i = 0
+    while i < len(text):
+        n = rnd.randint(1, 40)
+        yield text[i:i + n]
+        i += n
+
+
+class CompressRoundTripTest(unittest.TestCase):
+    def test_round_trip_across_chunk_boundaries(self):
+        rnd = random.Random(3)
+        words = [w for pair in build_table() for w in pair] + ["빌드", "ok", " ", "\n", ESCAPE, "-", ">"]
+        text = "".join(rnd.choice(words) for _ in range(5000))
+        packed = "".join(transform(pieces(text, rnd), compressor(chunk_size=64)))
+        restored = "".join(transform(pieces(packed, rnd), expander(chunk_size=64)))
+        self.assertEqual(restored, text)
+
+    def test_compresses_known_words(self):
+        out = "".join(transform(["configuration -> PASSED"], compressor()))
+        self.assertEqual(out, "cfg → ✅")
+
+    def test_finished_lines_are_emitted_before_chunk_fills(self):
+        transformer = compressor()
+        self.assertEqual(transformer.feed("build configuration\nnext "), "build cfg\n")
+        self.assertEqual(transformer.feed("line"), "")
+        self.assertEqual(transformer.close(), "next line")
+
+    def test_invalid_utf8_round_trips_with_surrogateescape(self):
+        raw = b"\xff\xfe configuration -> ok\n"
+        text = "".join(read_chunks(io.BytesIO(raw), 4))
+        packed = "".join(transform([text], compressor()))
+        restored = "".join(transform([packed], expander()))
+        self.assertEqual(restored.encode("utf-8", "surrogateescape"), raw)
+
+
+    def test_check_roundtrip_in_expand_mode(self):
+        text = "configuration -> implementation ✅ 빌드 ok\n" * 50
+        packed = "".join(transform([text], compressor()))
+        with tempfile.TemporaryDirectory() as tmp:
+            plain, compact = os.path.join(tmp, "build.log"), os.path.join(tmp, "build.log.uc")
+            for path, data in ((plain, text), (compact, packed)):
+                with open(path, "w", encoding="utf-8") as fh:
+                    fh.write(data)
+            with contextlib.redirect_stderr(io.StringIO()):
+                self.assertEqual(main([plain, "--check-roundtrip"]), 0)
+                self.assertEqual(main([compact, "--expand", "--check-roundtrip"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from sgtools.context import ImportCycleError, MissingImportError, compile_context, parse_imports
+
+
+class CompileContextTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self._tmp.name, ".gemini")
+        self.cache = os.path.join(self.dir, ".cache", "bundle.json")
+        self.write("GEMINI.md", "# 루트\n@FLAGS.md\n@modes/MODE_A.md\n")
+        self.write("FLAGS.md", "플래그\n")
+        self.write("modes/MODE_A.md", "모드 A\n@../RULES.md\n")
+        self.write("RULES.md", "규칙\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name: str, text: str) -> None:
+        path = os.path.join(self.dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(text)
+
+    def compile(self):
+        return compile_context(os.path.join(self.dir, "GEMINI.md"), self.cache)
+
+    def test_assembles_imports_in_order(self):
+        bundle = self.compile()
+        self.assertEqual(bundle.order, ["FLAGS.md", "RULES.md", "modes/MODE_A.md", "GEMINI.md"])
+        self.assertEqual(bundle.text, "# 루트\n플래그\n모드 A\n규칙\n")
+
+    def test_cache_hit_and_partial_rebuild(self):
+        first = self.compile()
+        self.assertEqual(sorted(first.rebuilt), sorted(first.order))
+        self.assertEqual(self.compile().rebuilt, [])
+
+        self.write("RULES.md", "규칙이 바뀌었습니다\n")
+        bundle = self.compile()
+        self.assertEqual(bundle.rebuilt, ["RULES.md"])
+        self.assertIn("규칙이 바뀌었습니다", bundle.text)
+        self.assertNotEqual(bundle.digest, first.digest)
+
+        path = os.path.join(self.dir, "FLAGS.md")
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertEqual(self.compile().rebuilt, [])
+
+    def test_cycle_is_reported(self):
+        self.write("RULES.md", "@GEMINI.md\n")
+        with self.assertRaises(ImportCycleError) as ctx:
+            self.compile()
+        self.assertEqual(ctx.exception.chain, ["GEMINI.md", "modes/MODE_A.md", "RULES.md", "GEMINI.md"])
+
+    def test_missing_import_names_importer(self):
+        self.write("FLAGS.md", "@NOPE.md\n")
+        with self.assertRaises(MissingImportError) as ctx:
+            self.compile()
+        self.assertEqual((ctx.exception.importer, ctx.exception.target), ("FLAGS.md", "NOPE.md"))
+
+    def test_commented_and_fenced_lines_are_not_imports(self):
+        text = "<!-- @A.md -->\n<!--\n@B.md\n-->\n```\n@C.md\n```\n  @D.md  \n이메일 a@E.md\n"
+        imports = [value for kind, value in parse_imports(text, "") if kind == "import"]
+        self.assertEqual(imports, ["D.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()
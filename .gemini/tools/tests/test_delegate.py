@@ -0,0 +1,88 @@
+import threading
+import unittest
+from collections import Counter
+
+from sgtools.delegate import (
+    FileInfo,
+    Shard,
+    WorkStealingPool,
+    _pack,
+    partition,
+)
+
+
+def _files(spec):
+    return [FileInfo(path, size) for path, size in spec]
+
+
+class PartitionTest(unittest.TestCase):
+    def test_huge_folder_is_split_under_folders(self):
+        files = _files([(f"big/sub{i}/f{j}.py", 1000) for i in range(4) for j in range(4)]
+                       + [("small/a.py", 100), ("README.md", 50)])
+        mode, shards = partition(files, "folders", 2)
+        self.assertEqual(mode, "folders")
+        self.assertGreater(len(shards), 2)
+        target = sum(f.size for f in files) // (2 * 4)
+        self.assertTrue(all(shard.bytes <= target for shard in shards))
+        self.assertNotIn("big/", [shard.label for shard in shards])
+        self.assertEqual(sorted(f.path for s in shards for f in s.files), sorted(f.path for f in files))
+
+    def test_auto_falls_back_to_files_when_unbalanced(self):
+        files = _files([(f"big/f{j}.py", 1000) for j in range(20)] + [("a/x.py", 10), ("b/y.py", 10)])
+        mode, shards = partition(files, "auto", 3)
+        self.assertEqual(mode, "files")
+        self.assertTrue(all(shard.label.startswith("files[") for shard in shards))
+
+    def test_auto_picks_folders_when_balanced(self):
+        files = _files([(f"d{i}/f{j}.py", 100) for i in range(4) for j in range(3)])
+        mode, _ = partition(files, "auto", 4)
+        self.assertEqual(mode, "folders")
+
+    def test_pack_keeps_bins_near_target(self):
+        files = _files([(f"f{i}.py", size) for i, size in enumerate([70, 50, 40, 30, 30, 20, 20, 10, 10])])
+        bins = _pack(files, 100)
+        sizes = [sum(f.size for f in members) for members in bins]
+        self.assertTrue(all(size <= 100 for size in sizes))
+        self.assertEqual(len(bins), 3)
+        self.assertEqual(sorted(f.path for members in bins for f in members), sorted(f.path for f in files))
+
+
+class WorkStealingPoolTest(unittest.TestCase):
+    def shards(self, count):
+        return [Shard(i, f"s{i}", _files([(f"f{i}.py", (i % 5 + 1) * 10)])) for i in range(count)]
+
+    def test_every_shard_runs_exactly_once(self):
+        seen = Counter()
+        lock = threading.Lock()
+
+        def agent(shard):
+            with lock:
+                seen[shard.id] += 1
+            return shard.id
+
+        report = WorkStealingPool(4).run(self.shards(30), agent)
+        self.assertEqual(seen, Counter(range(30)))
+        self.assertEqual([r.shard.id for r in report.results], list(range(30)))
+        self.assertEqual([r.output for r in report.results], list(range(30)))
+
+    def test_agent_exception_is_reported_as_shard_error(self):
+        def agent(shard):
+            if shard.id == 2:
+                raise RuntimeError("boom")
+            return "ok"
+
+        report = WorkStealingPool(2).run(self.shards(5), agent)
+        errors = {r.shard.id: r.error for r in report.results if r.error}
+        self.assertEqual(errors, {2: "RuntimeError: boom"})
+        self.assertEqual(len(report.results), 5)
+
+    def test_concurrency_range(self):
+        for workers in (0, 16):
+            with self.assertRaises(ValueError):
+                WorkStealingPool(workers)
+        WorkStealingPool(1)
+        WorkStealingPool(15)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from sgtools.project_index import ProjectIndex
+
+
+def git(cwd: str, *args: str) -> None:
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+
+def write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(text)
+
+
+@unittest.skipIf(shutil.which("git") is None, "git이 필요합니다")
+class SubdirectoryRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo = self._tmp.name
+        self.sub = os.path.join(self.repo, "sub")
+        write(os.path.join(self.repo, "top.py"), "x = 1\n")
+        write(os.path.join(self.sub, "a", "x.py"), "def f():\n    pass\n")
+        write(os.path.join(self.sub, "b", "y.py"), "class Y:\n    pass\n")
+        git(self.repo, "init", "-q")
+        git(self.repo, "add", ".")
+        git(self.repo, "commit", "-qm", "init")
+        self.index = ProjectIndex(self.sub, os.path.join(self.repo, "index.sqlite"))
+        self.assertEqual(self.index.refresh().added, 2)
+
+    def tearDown(self):
+        self.index.close()
+        self._tmp.cleanup()
+
+    def test_refresh_sees_working_tree_edit(self):
+        write(os.path.join(self.sub, "a", "x.py"), "def f():\n    return 2\n\ndef g():\n    pass\n")
+        stats = self.index.refresh()
+        self.assertEqual(stats.strategy, "git-incremental")
+        self.assertEqual(stats.changed, 1)
+        self.assertEqual(self.index.refresh().changed, 0)
+
+    def test_refresh_sees_committed_changes(self):
+        write(os.path.join(self.sub, "b", "y.py"), "class Y:\n    value = 3\n")
+        write(os.path.join(self.sub, "c", "z.py"), "z = 0\n")
+        write(os.path.join(self.repo, "top.py"), "x = 2\n")
+        git(self.repo, "add", ".")
+        git(self.repo, "commit", "-qm", "change")
+        stats = self.index.refresh()
+        self.assertEqual((stats.changed, stats.added), (1, 1))
+        paths = {row[0] for row in self.index.db.execute("SELECT path FROM files")}
+        self.assertEqual(paths, {"a/x.py", "b/y.py", "c/z.py"})
+
+
+if __name__ == "__main__":
+    unittest.main()
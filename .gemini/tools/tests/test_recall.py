@@ -0,0 +1,76 @@
+import os
+import random
+import tempfile
+import unittest
+
+from sgtools.memory.recall import RecallIndex, ngrams
+from sgtools.memory.store import MemoryStore, MemoryStoreError
+
+
+class RecallIndexTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "memory")
+        self.store = MemoryStore(self.path)
+        self.store.put("plan_auth", "JWT 인증 시스템 구현")
+        self.store.put("decisions", "세션 저장소로 Redis를 쓰기로 결정")
+        self.store.put("task_1.1", "로그인 화면 스타일 정리")
+
+    def tearDown(self):
+        self.store.close()
+        self._tmp.cleanup()
+
+    def test_korean_particles_share_bigrams(self):
+        self.assertIn("인증", ngrams("인증은"))
+
+    def test_pending_changes_keep_keys_only(self):
+        index = RecallIndex(self.store)
+        self.store.put("blockers", "인증 서버 응답 지연")
+        self.store.delete("task_1.1")
+        self.assertEqual(index._changed, {"blockers", "task_1.1"})
+        keys = [key for key, _score in index.search("인증")]
+        self.assertEqual(set(keys), {"blockers", "plan_auth"})
+        self.assertNotIn("task_1.1", index._docs)
+
+    def test_recall_respects_budget_and_snapshot(self):
+        index = RecallIndex(self.store)
+        hits = index.recall("Redis 세션", token_budget=1000)
+        self.assertEqual(hits[0].key, "decisions")
+        self.assertEqual(index.recall("Redis 세션", token_budget=3), [])
+        index.save()
+        self.store.close()
+
+        self.store = MemoryStore(self.path)
+        reopened = RecallIndex(self.store)
+        self.assertTrue(reopened._load_snapshot())
+        self.assertEqual(reopened.recall("Redis 세션", 1000)[0].key, "decisions")
+
+    def test_limited_search_matches_full_ranking(self):
+        rnd = random.Random(3)
+        words = ["인증", "세션", "토큰", "만료", "로그인", "화면", "스타일", "결정", "구현", "합니다"]
+        with self.store.batch():
+            for i in range(300):
+                self.store.put(f"note_{i:03d}", " ".join(rnd.choice(words) for _ in range(12)) + " 합니다")
+        index = RecallIndex(self.store)
+        for query in ("인증 토큰 만료", "로그인 화면 스타일을 정리합니다", "Redis"):
+            full = index.search(query)
+            self.assertEqual(index.search(query, 5), full[:5])
+
+    def test_save_skips_index_that_was_never_loaded(self):
+        index = RecallIndex(self.store)
+        self.store.put("blockers", "인증 서버 응답 지연")
+        index.save()
+        self.assertFalse(index._loaded)
+        self.assertFalse(os.path.exists(index.path))
+
+    def test_read_only_store_works_while_locked(self):
+        self.store.flush()
+        with MemoryStore(self.path, read_only=True) as reader:
+            self.assertEqual(reader.get("plan_auth"), "JWT 인증 시스템 구현")
+            self.assertEqual(RecallIndex(reader).recall("JWT", 1000)[0].key, "plan_auth")
+            with self.assertRaises(MemoryStoreError):
+                reader.put("x", "y")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from sgtools.memory.server import MemoryServer
+from sgtools.memory.store import MemoryStore
+
+
+class MemoryServerTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "memory")
+        self.store = MemoryStore(self.path)
+        self.server = MemoryServer(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self._tmp.cleanup()
+
+    def serve(self, *lines: str) -> list:
+        out = io.StringIO()
+        self.server.serve(io.StringIO("\n".join(lines) + "\n"), out)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def call(self, tool: str, arguments) -> dict:
+        request = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                   "params": {"name": tool, "arguments": arguments}}
+        return self.serve(json.dumps(request))[0]["result"]
+
+    def test_wrong_argument_types_are_tool_errors(self):
+        cases = [
+            ("write_memory", {"memory_name": "a", "content": 5}),
+            ("recall_memories", {"query": 3}),
+            ("save_checkpoint", {"checkpoint_id": 7}),
+            ("load_checkpoint", {"checkpoint_id": ["x"]}),
+            ("read_memory", "not an object"),
+        ]
+        for tool, arguments in cases:
+            with self.subTest(tool=tool):
+                self.assertTrue(self.call(tool, arguments)["isError"])
+
+    def test_non_object_messages_get_invalid_request(self):
+        responses = self.serve("[1, 2]", '"ping"', json.dumps({"jsonrpc": "2.0", "id": 2, "method": "ping"}))
+        self.assertEqual([r.get("error", {}).get("code") for r in responses], [-32600, -32600, None])
+
+    def test_unencodable_value_does_not_poison_later_writes(self):
+        bad = self.call("write_memory", {"memory_name": "bad", "content": "x\udcff"})
+        self.assertTrue(bad["isError"])
+        good = self.call("write_memory", {"memory_name": "good", "content": "fine"})
+        self.assertFalse(good["isError"])
+        self.store.close()
+        with MemoryStore(self.path) as store:
+            self.assertEqual(store.keys(), ["good"])
+        self.store = MemoryStore(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
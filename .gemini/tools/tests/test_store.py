@@ -0,0 +1,100 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from sgtools.memory.store import MemoryStore
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def crash_after_writes(path: str, code: str) -> None:
+    """하위 프로세스에서 쓰기 후 닫지 않고 종료해 비정상 종료를 흉내 냅니다."""
+    script = (
+        "import os\n"
+        "from sgtools.memory.store import MemoryStore\n"
+        f"store = MemoryStore({path!r})\n"
+        f"{code}\n"
+        "store.flush()\n"
+        "os._exit(0)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=TOOLS_DIR, check=True)
+
+
+class MemoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "memory")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_reopen_uses_snapshot_and_replays_tail(self):
+        with MemoryStore(self.path) as store:
+            store.put("plan_auth", "JWT 인증")
+            store.put("task_1.1", "미들웨어")
+        crash_after_writes(self.path, "store.put('task_1.2', '토큰 검증')\nstore.delete('plan_auth')")
+        with MemoryStore(self.path) as store:
+            self.assertEqual(store.keys(), ["task_1.1", "task_1.2"])
+            self.assertEqual(store.get("task_1.2"), "토큰 검증")
+
+    def test_torn_tail_is_truncated(self):
+        with MemoryStore(self.path) as store:
+            store.put("a", "1")
+        crash_after_writes(self.path, "store.put('b', '2' * 100)")
+        log = os.path.join(self.path, "data.log")
+        size = os.path.getsize(log)
+        with open(log, "r+b") as fh:
+            fh.truncate(size - 10)
+        with MemoryStore(self.path) as store:
+            self.assertEqual(store.keys(), ["a"])
+            store.put("c", "3")
+        with MemoryStore(self.path) as store:
+            self.assertEqual(store.keys(), ["a", "c"])
+            self.assertEqual(store.get("c"), "3")
+
+    def test_rejected_snapshot_is_discarded(self):
+        with MemoryStore(self.path) as store:
+            for i in range(20):
+                store.put(f"todo_{i}", "x" * 50)
+        log = os.path.join(self.path, "data.log")
+        snapshot = os.path.join(self.path, "index.json")
+        with open(log, "r+b") as fh:
+            fh.truncate(os.path.getsize(log) // 2)
+        with MemoryStore(self.path) as store:
+            self.assertFalse(os.path.exists(snapshot))
+            kept = store.keys()
+            self.assertTrue(0 < len(kept) < 20)
+        # 로그가 다시 자란 뒤 비정상 종료해도 옛 스냅샷을 채택하지 않습니다.
+        crash_after_writes(self.path, "\n".join(f"store.put('late_{i}', 'y' * 50)" for i in range(30)))
+        with MemoryStore(self.path) as store:
+            for key in kept:
+                self.assertEqual(store.get(key), "x" * 50)
+            self.assertEqual(len(store.keys("late_*")), 30)
+
+    def test_delete_matching_uses_glob(self):
+        with MemoryStore(self.path) as store:
+            for key in ("task_1.1", "task_1.2", "task_2.1", "todo_1.1.1"):
+                store.put(key, key)
+            self.assertEqual(store.delete_matching("task_1.*"), ["task_1.1", "task_1.2"])
+            self.assertEqual(store.keys(), ["task_2.1", "todo_1.1.1"])
+            self.assertEqual(store.keys("t*_1.*"), ["todo_1.1.1"])
+
+    def test_put_rejects_unencodable_values_before_queueing(self):
+        from sgtools.memory.store import MemoryStoreError
+
+        with MemoryStore(self.path) as store:
+            seen = []
+            store.observe(lambda key, value: seen.append(key))
+            for key, value in (("a", "x\udcff"), ("b", 5), ("\udcff", "v")):
+                with self.assertRaises(MemoryStoreError):
+                    store.put(key, value)
+            store.put("ok", "fine")
+            store.flush()
+            self.assertEqual(seen, ["ok"])
+            self.assertEqual(store.keys(), ["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
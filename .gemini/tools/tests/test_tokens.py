@@ -0,0 +1,56 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from sgtools import tokens
+
+
+class BaselineCheckTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        gemini = os.path.join(self._tmp.name, ".gemini")
+        os.makedirs(gemini)
+        self.root = os.path.join(gemini, "GEMINI.md")
+        with open(self.root, "w", encoding="utf-8") as fh:
+            fh.write("# 루트\n@MODE_Brainstorming_ko.md\n")
+        with open(os.path.join(gemini, "MODE_Brainstorming_ko.md"), "w", encoding="utf-8") as fh:
+            fh.write("# 브레인스토밍\n" + "탐색 " * 200)
+        self.baseline = os.path.join(gemini, "token-budget.json")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_main(self, *args: str) -> int:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return tokens.main(["--root", self.root, "--baseline", self.baseline, *args])
+
+    def test_check_rejects_lazy_modes_mismatch(self):
+        self.assertEqual(self.run_main("--save-baseline", "--budget", "1000"), 0)
+        self.assertEqual(self.run_main("--check"), 0)
+        self.assertEqual(self.run_main("--lazy-modes", "--check"), 1)
+        self.assertEqual(self.run_main("--save-baseline", "--lazy-modes"), 0)
+        self.assertEqual(self.run_main("--check"), 0)
+
+    def test_no_lazy_modes_overrides_lazy_baseline(self):
+        self.assertEqual(self.run_main("--save-baseline", "--lazy-modes"), 0)
+        self.assertEqual(self.run_main("--no-lazy-modes", "--check"), 1)
+        self.assertEqual(self.run_main("--save-baseline", "--no-lazy-modes"), 0)
+        self.assertFalse(tokens.load_baseline(self.baseline)["lazy_modes"])
+        self.assertEqual(self.run_main("--check"), 0)
+
+    def test_malformed_baseline_is_an_error(self):
+        with open(self.baseline, "w", encoding="utf-8") as fh:
+            fh.write("{not json")
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+            code = tokens.main(["--root", self.root, "--baseline", self.baseline, "--check"])
+        self.assertEqual(code, 1)
+        self.assertTrue(stderr.getvalue().startswith("error: "))
+        self.assertEqual(self.run_main("--save-baseline"), 0)
+        self.assertEqual(self.run_main("--check"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
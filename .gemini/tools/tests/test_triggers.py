@@ -0,0 +1,47 @@
+import unittest
+
+from sgtools.triggers import MODE_FILES, Signals, evaluate
+
+
+class EvaluateTest(unittest.TestCase):
+    def test_safe_mode_overrides_validate_and_detected_optimizations(self):
+        activation = evaluate(Signals(text="로그인 흐름 다듬기", resource_usage=0.9))
+        self.assertIn("--safe-mode", activation.flags)
+        self.assertIn("--uc", activation.flags)
+        self.assertNotIn("--validate", activation.flags)
+        self.assertNotIn("--loop", activation.flags)
+        self.assertEqual(list(activation.flags)[0], "--safe-mode")
+
+    def test_explicit_flags_survive_safe_mode(self):
+        activation = evaluate(Signals(text="다듬기 --loop --no-mcp 기호 작업", critical=True))
+        self.assertIn("--loop", activation.flags)
+        self.assertNotIn("--serena", activation.flags)
+        self.assertIn(MODE_FILES["--task-manage"], activation.modes)
+
+    def test_ascii_keywords_need_word_boundaries(self):
+        self.assertEqual(evaluate(Signals(text="symbolic links, polisher e2etests")).flags, {})
+        flags = evaluate(Signals(text="rename symbol, then polish the docs")).flags
+        self.assertIn("--serena", flags)
+        self.assertIn("--loop", flags)
+        self.assertIn("--seq", evaluate(Signals(text="debug하기")).flags)
+
+    def test_inflected_keywords_match(self):
+        cases = {
+            "debugging the auth flow": "--seq",
+            "refactor symbols": "--serena",
+            "polishing UI": "--loop",
+            "refined layout": "--task-manage",
+            "iterating on copy": "--loop",
+        }
+        for text, flag in cases.items():
+            with self.subTest(text=text):
+                self.assertIn(flag, evaluate(Signals(text=text)).flags)
+
+    def test_words_containing_keywords_do_not_match(self):
+        for text in ("symbolic links", "debugger attached", "polisher", "reiterate later", "refinement"):
+            with self.subTest(text=text):
+                self.assertEqual(evaluate(Signals(text=text)).flags, {})
+
+
+if __name__ == "__main__":
+    unittest.main()